@@ -0,0 +1,79 @@
+"""Compare hosts-file size and parse cost for the line and packed layouts.
+
+Usage: ``python benchmarks/bench_hosts_layout.py [sizes...]`` from the repo root.
+"""
+
+from __future__ import annotations
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.features.site_blocker import (  # noqa: E402
+    DEFAULT_HOSTNAMES_PER_LINE,
+    HOSTS_LAYOUT_LINE,
+    HOSTS_LAYOUT_PACKED,
+    HostEntry,
+    render_hosts_lines,
+)
+
+
+def _resolver_parse(text: str) -> dict[str, str]:
+    """Approximate what a stub resolver does when loading the hosts file."""
+    table: dict[str, str] = {}
+    for line in text.splitlines():
+        tokens = line.split("#", 1)[0].split()
+        if len(tokens) < 2:
+            continue
+        address = tokens[0]
+        for hostname in tokens[1:]:
+            table.setdefault(hostname.lower(), address)
+    return table
+
+
+def _entries(count: int) -> list[HostEntry]:
+    return [
+        HostEntry(
+            hostname=f"tracker-{index:06d}.example.com",
+            redirect_ip="0.0.0.0" if index % 10 == 0 else "127.0.0.1",
+        )
+        for index in range(count)
+    ]
+
+
+def main(sizes: list[int]) -> None:
+    header = f"{'entries':>8} {'layout':>7} {'lines':>8} {'bytes':>10} {'render ms':>10} {'parse ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for size in sizes:
+        entries = _entries(size)
+        for layout in (HOSTS_LAYOUT_LINE, HOSTS_LAYOUT_PACKED):
+            lines = render_hosts_lines(entries, layout, DEFAULT_HOSTNAMES_PER_LINE)
+            text = "\n".join(lines) + "\n"
+            repeats = max(1, 200_000 // size)
+            render_ms = (
+                timeit.timeit(
+                    lambda: render_hosts_lines(
+                        entries, layout, DEFAULT_HOSTNAMES_PER_LINE
+                    ),
+                    number=repeats,
+                )
+                * 1000
+                / repeats
+            )
+            parse_ms = (
+                timeit.timeit(lambda: _resolver_parse(text), number=repeats)
+                * 1000
+                / repeats
+            )
+            assert len(_resolver_parse(text)) == size
+            print(
+                f"{size:>8} {layout:>7} {len(lines):>8} {len(text.encode('utf-8')):>10} "
+                f"{render_ms:>10.2f} {parse_ms:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
@@ -1,30 +1,150 @@
 from __future__ import annotations
 
+import argparse
+import logging
 import sys
+import threading
+from pathlib import Path
 
 from PySide6.QtWidgets import QApplication
 
-from src.config.config_loader import Config
-from src.config.db import get_session, init_db
-from src.features.site_blocker import SiteBlocker, SiteBlockerError
-from src.ui.main_window import MainWindow
+from src.ui.single_instance import LaunchRequest, SingleInstanceGuard, instance_key
+
+
+def parse_launch_request(argv: list[str]) -> LaunchRequest:
+    parser = argparse.ArgumentParser(description="SBAAS Productivity")
+    parser.add_argument(
+        "--block", action="append", default=[], metavar="DOMAIN", help="Block a domain."
+    )
+    parser.add_argument(
+        "--focus", type=int, metavar="MINUTES", help="Start a focus session."
+    )
+    # Qt consumes its own flags (e.g. -style); ignore anything we don't know.
+    args, _unknown = parser.parse_known_args(argv)
+    return LaunchRequest(block_domains=tuple(args.block), focus_minutes=args.focus)
+
+
+def run_archive_job(archive_path: Path, horizon_days: int) -> None:
+    from src.features.focus_archive import FocusArchiveService
+
+    try:
+        moved = FocusArchiveService(archive_path).archive_older_than(horizon_days)
+    except Exception:  # pragma: no cover - background maintenance only
+        logging.getLogger(__name__).exception("Focus session archiving failed")
+        return
+    if moved:
+        logging.getLogger(__name__).info("Archived %d focus sessions", moved)
 
 
 def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    request = parse_launch_request(sys.argv[1:])
+    app = QApplication(sys.argv)
+
+    # Hand off to an already running instance before touching the DB or hosts file.
+    guard = SingleInstanceGuard(instance_key())
+    if guard.forward(request):
+        sys.exit(0)
+    if not guard.listen():
+        # Another launch claimed the name after our first attempt; hand off to it instead.
+        if guard.forward(request, timeout_ms=2000):
+            sys.exit(0)
+        logging.getLogger(__name__).error(
+            "Another SBAAS instance owns %s but is not responding", guard.key
+        )
+        sys.exit(1)
+    app.aboutToQuit.connect(guard.close)
+
+    from src.config.config_loader import Config
+    from src.config.db import get_session, init_db
+    from src.features.blocklist_profiles import ProfileService
+    from src.features.site_blocker import (
+        DEFAULT_HOSTS_PATH,
+        SiteBlocker,
+        SiteBlockerError,
+    )
+    from src.ui.main_window import MainWindow
+    from src.ui.stall_watchdog import EventLoopWatchdog
+
     config = Config()
     init_db()
 
-    site_blocker = SiteBlocker()
+    hosts_writer = None
+    if config.hosts_helper_enabled:
+        from src.features.hosts_helper import default_key_path, ensure_helper
+
+        try:
+            hosts_writer = ensure_helper(
+                DEFAULT_HOSTS_PATH,
+                config.hosts_helper_port,
+                config.hosts_helper_key_path or default_key_path(DEFAULT_HOSTS_PATH),
+                config.base_dir,
+                config.hosts_layout,
+                config.hostnames_per_line,
+            )
+        except SiteBlockerError:
+            logging.getLogger(__name__).warning(
+                "Hosts helper unavailable; writing in-process", exc_info=True
+            )
+
+    site_blocker = SiteBlocker(
+        hosts_writer=hosts_writer,
+        hosts_layout=config.hosts_layout,
+        hostnames_per_line=config.hostnames_per_line,
+    )
+    profiles = ProfileService(site_blocker)
     warning_message: str | None = None
     try:
         with get_session() as session:
+            profiles.load_current(session)
             site_blocker.apply_blocklist(session)
+        if hosts_writer is not None:
+            hosts_writer.wait()
     except SiteBlockerError as exc:
         warning_message = "We couldn't set up site blocking because Windows needs administrator access. Please restart SBAAS Productivity with “Run as administrator” to enable blocking."
 
-    app = QApplication(sys.argv)
-    window = MainWindow(config, site_blocker=site_blocker, warning_message=warning_message)
+    if config.block_page_enabled:
+        from src.features.block_page import BlockPageError, BlockPageServer
+
+        block_page = BlockPageServer(
+            config.block_page_host,
+            config.block_page_port,
+            config.block_page_flush_seconds,
+            hostname_filter=site_blocker.snapshot.__contains__,
+        )
+        try:
+            block_page.start()
+        except BlockPageError:
+            logging.getLogger(__name__).warning(
+                "Block page listener disabled", exc_info=True
+            )
+        else:
+            app.aboutToQuit.connect(block_page.stop)
+
+    window = MainWindow(
+        config,
+        site_blocker=site_blocker,
+        warning_message=warning_message,
+        profile_service=profiles,
+    )
+    guard.request_received.connect(window.handle_launch_request)
+    watchdog = EventLoopWatchdog(threshold_ms=config.stall_threshold_ms, parent=window)
+    watchdog.start()
+    app.aboutToQuit.connect(watchdog.stop)
+    startup_profile = config.startup_profile_seconds
+    if startup_profile:
+        window.start_profiler(startup_profile)
     window.show()
+    threading.Thread(
+        target=run_archive_job,
+        args=(config.archive_database_path, config.focus_archive_horizon_days),
+        name="focus-archive",
+        daemon=True,
+    ).start()
+    if not request.is_empty:
+        window.handle_launch_request(request)
     sys.exit(app.exec())
 
 
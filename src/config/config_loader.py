@@ -71,5 +71,98 @@ class Config:
             db_path = self.base_dir / db_path
         return f"sqlite:///{db_path.as_posix()}"
 
+    @property
+    def archive_database_path(self) -> Path:
+        archive_path = Path(self.get("database.archive_path", "data/sbaas_archive.db"))
+        if not archive_path.is_absolute():
+            archive_path = self.base_dir / archive_path
+        return archive_path
+
+    @property
+    def blocklist_subscriptions(self) -> list[Path]:
+        locations = self.get("blocking.subscriptions", []) or []
+        paths = [Path(str(location)).expanduser() for location in locations]
+        return [path if path.is_absolute() else self.base_dir / path for path in paths]
+
+    @property
+    def subscription_sync_minutes(self) -> int:
+        return int(self.get("blocking.subscription_sync_minutes", 60))
+
+    @property
+    def block_page_enabled(self) -> bool:
+        return bool(self.get("blocking.block_page.enabled", False))
+
+    @property
+    def block_page_host(self) -> str:
+        return str(self.get("blocking.block_page.host", "127.0.0.1"))
+
+    @property
+    def block_page_port(self) -> int:
+        return int(self.get("blocking.block_page.port", 80))
+
+    @property
+    def block_page_flush_seconds(self) -> float:
+        return float(self.get("blocking.block_page.flush_interval_seconds", 30))
+
+    @property
+    def hosts_layout(self) -> str:
+        return str(self.get("blocking.hosts_layout", "line"))
+
+    @property
+    def hostnames_per_line(self) -> int:
+        return int(self.get("blocking.hostnames_per_line", 9))
+
+    @property
+    def hosts_helper_enabled(self) -> bool:
+        return bool(self.get("blocking.hosts_helper.enabled", False))
+
+    @property
+    def hosts_helper_port(self) -> int:
+        return int(self.get("blocking.hosts_helper.port", 47811))
+
+    @property
+    def hosts_helper_key_path(self) -> Path | None:
+        """Explicit helper secret location; ``None`` keeps it beside the hosts file."""
+        raw = self.get("blocking.hosts_helper.key_path")
+        if not raw:
+            return None
+        key_path = Path(raw)
+        if not key_path.is_absolute():
+            key_path = self.base_dir / key_path
+        return key_path
+
+    @property
+    def stall_threshold_ms(self) -> int:
+        return int(self.get("diagnostics.stall_threshold_ms", 250))
+
+    @property
+    def profile_seconds(self) -> float:
+        return float(self.get("diagnostics.profile_seconds", 10))
+
+    @property
+    def profile_dir(self) -> Path:
+        profile_dir = Path(self.get("diagnostics.profile_dir", "data/profiles"))
+        if not profile_dir.is_absolute():
+            profile_dir = self.base_dir / profile_dir
+        return profile_dir
+
+    @property
+    def startup_profile_seconds(self) -> float | None:
+        """Seconds to profile from launch, taken from ``SBAAS_PROFILE_SECONDS``."""
+        raw = os.getenv("SBAAS_PROFILE_SECONDS")
+        if not raw:
+            return None
+        try:
+            seconds = float(raw)
+        except ValueError as exc:
+            raise ConfigError(
+                f"SBAAS_PROFILE_SECONDS must be a number, got {raw!r}"
+            ) from exc
+        return seconds if seconds > 0 else None
+
+    @property
+    def focus_archive_horizon_days(self) -> int:
+        return int(self.get("focus.archive_horizon_days", 365))
+
 
 __all__ = ["Config", "ConfigError"]
@@ -3,7 +3,8 @@ from __future__ import annotations
 from contextlib import contextmanager
 from typing import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, inspect
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from .config_loader import Config
@@ -28,13 +29,37 @@ _CONFIG = Config()
 ENGINE, SessionLocal = _create_engine(_CONFIG)
 
 
-def init_db() -> None:
+def init_db(engine: Engine | None = None) -> None:
     """Create database tables if they do not exist."""
     # Import models so SQLAlchemy is aware before running metadata creation.
+    from src.features import block_page as _block_page  # noqa: F401
+    from src.features import blocklist_profiles as _blocklist_profiles  # noqa: F401
+    from src.features import focus_archive as _focus_archive  # noqa: F401
     from src.features import focus_timer as _focus_timer  # noqa: F401
     from src.features import site_blocker as _site_blocker  # noqa: F401
 
-    Base.metadata.create_all(bind=ENGINE)
+    engine = engine or ENGINE
+    Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables, so add columns and indexes introduced after they were created.
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {
+                column["name"]
+                for column in inspector.get_columns(table.name, schema=table.schema)
+            }
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+                # Columns may carry SQL that derives their value for pre-existing rows.
+                backfill = column.info.get("backfill")
+                if backfill:
+                    conn.exec_driver_sql(backfill)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 
 @contextmanager
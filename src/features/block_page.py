@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Mapping
+
+from sqlalchemy import DateTime, Integer, String, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from src.config.db import Base, get_session
+
+_LOGGER = logging.getLogger(__name__)
+
+# Requests whose headers exceed this are dropped without a response.
+_MAX_REQUEST_HEAD = 8192
+
+_BLOCK_PAGE_BODY = (
+    b'<!doctype html><html><head><meta charset="utf-8"><title>Blocked</title></head>'
+    b'<body style="font-family:sans-serif;text-align:center;margin-top:20vh;color:#333">'
+    b"<h1>Stay focused</h1><p>This site is blocked by SBAAS Productivity.</p></body></html>"
+)
+_BLOCK_PAGE_RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: text/html; charset=utf-8\r\n"
+    b"Cache-Control: no-store\r\n"
+    b"Connection: close\r\n"
+    b"Content-Length: "
+    + str(len(_BLOCK_PAGE_BODY)).encode("ascii")
+    + b"\r\n\r\n"
+    + _BLOCK_PAGE_BODY
+)
+
+
+class BlockPageError(RuntimeError):
+    """Raised when the block page listener cannot be started."""
+
+
+class BlockHit(Base):
+    """Aggregated count of requests that reached the block page per hostname."""
+
+    __tablename__ = "block_hits"
+
+    hostname: Mapped[str] = mapped_column(String(255), primary_key=True)
+    hit_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_hit_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+
+def record_hits(
+    session: Session, hits: Mapping[str, int], *, now: datetime | None = None
+) -> None:
+    """Add a batch of in-memory hit counts to the persisted totals."""
+    if not hits:
+        return
+    seen_at = now or datetime.now(timezone.utc)
+    upsert = sqlite_insert(BlockHit.__table__)
+    session.execute(
+        upsert.on_conflict_do_update(
+            index_elements=[BlockHit.hostname],
+            set_={
+                "hit_count": BlockHit.hit_count + upsert.excluded.hit_count,
+                "last_hit_at": upsert.excluded.last_hit_at,
+            },
+        ),
+        [
+            {"hostname": hostname, "hit_count": count, "last_hit_at": seen_at}
+            for hostname, count in hits.items()
+        ],
+    )
+
+
+def top_hits(session: Session, limit: int = 5) -> list[tuple[str, int]]:
+    """Return the most frequently hit hostnames, highest first."""
+    stmt = (
+        select(BlockHit.hostname, BlockHit.hit_count)
+        .order_by(BlockHit.hit_count.desc())
+        .limit(limit)
+    )
+    return [(hostname, count) for hostname, count in session.execute(stmt)]
+
+
+def _extract_host(head: bytes) -> str | None:
+    index = head.lower().find(b"\r\nhost:")
+    if index < 0:
+        return None
+    start = index + len(b"\r\nhost:")
+    end = head.find(b"\r\n", start)
+    value = head[start : end if end >= 0 else len(head)].strip()
+    hostname = value.split(b":", 1)[0].decode("ascii", "ignore").lower().rstrip(".")
+    return hostname or None
+
+
+def _write_hits(hits: Mapping[str, int]) -> None:
+    with get_session() as session:
+        record_hits(session, hits)
+
+
+class _BlockPageProtocol(asyncio.Protocol):
+    __slots__ = ("_server", "_transport", "_buffer")
+
+    def __init__(self, server: BlockPageServer) -> None:
+        self._server = server
+        self._transport: asyncio.Transport | None = None
+        self._buffer = b""
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._transport = transport  # type: ignore[assignment]
+
+    def data_received(self, data: bytes) -> None:
+        transport = self._transport
+        if transport is None:
+            return
+        buffer = self._buffer + data if self._buffer else data
+        end = buffer.find(b"\r\n\r\n")
+        if end < 0:
+            if len(buffer) > _MAX_REQUEST_HEAD:
+                transport.close()
+            else:
+                self._buffer = buffer
+            return
+
+        self._server._count(_extract_host(buffer[:end]))
+        transport.write(_BLOCK_PAGE_RESPONSE)
+        transport.close()
+
+
+class BlockPageServer:
+    """Serves a static block page on the redirect IP and tallies hits per hostname.
+
+    The listener runs on its own asyncio loop in a daemon thread. Counters are
+    plain dict increments on that loop; every ``flush_interval`` seconds the
+    current dict is swapped out and written to SQLite in one batch off-loop.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 80,
+        flush_interval: float = 30.0,
+        *,
+        hostname_filter: Callable[[str], bool] | None = None,
+        on_flush: Callable[[Mapping[str, int]], None] = _write_hits,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.flush_interval = flush_interval
+        self.hostname_filter = hostname_filter
+        self.on_flush = on_flush
+        self._hits: dict[str, int] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._flush_task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, timeout: float = 5.0) -> None:
+        if self.running:
+            return
+
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        errors: list[BaseException] = []
+
+        def run() -> None:
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self._open())
+            except BaseException as exc:  # noqa: BLE001 - surfaced to the caller below
+                errors.append(exc)
+                ready.set()
+                loop.close()
+                return
+            ready.set()
+            try:
+                loop.run_forever()
+            finally:
+                loop.close()
+
+        self._loop = loop
+        self._thread = threading.Thread(
+            target=run, name="block-page-server", daemon=True
+        )
+        self._thread.start()
+        if not ready.wait(timeout) or errors:
+            self._thread = None
+            self._loop = None
+            detail = errors[0] if errors else "timed out"
+            raise BlockPageError(
+                f"Could not listen on {self.host}:{self.port}: {detail}"
+            )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Close the listener and flush any pending counters."""
+        loop, thread = self._loop, self._thread
+        if loop is None or thread is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._close(), loop)
+        try:
+            future.result(timeout)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            self._loop = None
+            self._thread = None
+
+    def _count(self, hostname: str | None) -> None:
+        if hostname is None:
+            return
+        if self.hostname_filter is not None and not self.hostname_filter(hostname):
+            return
+        self._hits[hostname] = self._hits.get(hostname, 0) + 1
+
+    async def _open(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._server = await loop.create_server(
+            lambda: _BlockPageProtocol(self),
+            self.host,
+            self.port,
+            backlog=1024,
+            reuse_address=True,
+        )
+        sockets = self._server.sockets or ()
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+        self._flush_task = loop.create_task(self._flush_periodically())
+
+    async def _close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self._flush()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self._flush()
+
+    async def _flush(self) -> None:
+        hits, self._hits = self._hits, {}
+        if not hits:
+            return
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.on_flush, hits)
+        except Exception:  # pragma: no cover - keep serving even if the DB is busy
+            _LOGGER.exception("Failed to flush %d block page counters", len(hits))
+            for hostname, count in hits.items():
+                self._hits[hostname] = self._hits.get(hostname, 0) + count
+
+
+__all__ = ["BlockHit", "BlockPageError", "BlockPageServer", "record_hits", "top_hits"]
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Mapping
+
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+    delete,
+    select,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from src.config.db import Base
+from src.features.site_blocker import SiteBlocker, SiteBlockerError, overlay_entries
+
+OVERRIDE_BLOCK = "block"
+OVERRIDE_ALLOW = "allow"
+
+
+class BlocklistProfile(Base):
+    """SQLAlchemy model for a person sharing the machine's base blocklist."""
+
+    __tablename__ = "blocklist_profiles"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    is_current: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+
+class ProfileSiteOverride(Base):
+    """A profile's addition to (``block``) or exception from (``allow``) the base list."""
+
+    __tablename__ = "profile_site_overrides"
+
+    profile_id: Mapped[int] = mapped_column(
+        ForeignKey("blocklist_profiles.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    url: Mapped[str] = mapped_column(String(255), primary_key=True)
+    action: Mapped[str] = mapped_column(String(8), nullable=False)
+    redirect_ip: Mapped[str] = mapped_column(
+        String(45), default="127.0.0.1", nullable=False
+    )
+
+
+@dataclass(slots=True, frozen=True)
+class ProfileOverrides:
+    blocked: Mapping[str, str] = field(default_factory=dict)
+    allowed: frozenset[str] = frozenset()
+
+    def apply(self, base: Mapping[str, str]) -> dict[str, str]:
+        return overlay_entries(base, self.blocked, self.allowed)
+
+
+class ProfileService:
+    """Layers per-profile overrides over the shared base list held by ``SiteBlocker``.
+
+    Profiles store only their overrides. Each profile's overrides and effective
+    set are cached; effective sets are keyed by the blocker's base version so
+    any change to the shared list invalidates them. Switching profiles diffs the
+    cached effective set against the live snapshot and applies just the delta.
+    """
+
+    def __init__(self, site_blocker: SiteBlocker) -> None:
+        self.site_blocker = site_blocker
+        self.current_id: int | None = None
+        self.current_name: str | None = None
+        self._overrides: dict[int, ProfileOverrides] = {}
+        self._effective: dict[int | None, tuple[int, dict[str, str]]] = {}
+
+    def add_profile(self, session: Session, name: str) -> BlocklistProfile:
+        """Create a profile (idempotent)."""
+        cleaned = name.strip()
+        if not cleaned:
+            raise ValueError("Profile name cannot be empty.")
+        profile = self._get(session, cleaned)
+        if profile is None:
+            profile = BlocklistProfile(name=cleaned)
+            session.add(profile)
+            session.flush()
+        return profile
+
+    def list_profiles(self, session: Session) -> list[str]:
+        return list(
+            session.scalars(
+                select(BlocklistProfile.name).order_by(BlocklistProfile.name)
+            )
+        )
+
+    def load_current(self, session: Session) -> str | None:
+        """Adopt the profile marked current in the DB without touching hosts; call before the first apply."""
+        profile = session.scalars(
+            select(BlocklistProfile).where(BlocklistProfile.is_current.is_(True))
+        ).first()
+        if profile is None:
+            return None
+        overrides = self._load_overrides(session, profile.id)
+        self.site_blocker.use_profile_overrides(
+            session, overrides.blocked, overrides.allowed
+        )
+        self.current_id = profile.id
+        self.current_name = profile.name
+        return profile.name
+
+    def reload(self, session: Session) -> str | None:
+        """Drop cached state and re-adopt the committed current profile, e.g. after a rolled-back edit."""
+        self._overrides.clear()
+        self._effective.clear()
+        self.current_id = None
+        self.current_name = None
+        self.site_blocker.snapshot.invalidate()
+        self.site_blocker.use_profile_overrides(session, {}, ())
+        return self.load_current(session)
+
+    def switch_profile(self, session: Session, name: str | None) -> tuple[int, int]:
+        """Make ``name`` (``None`` = base list only) current; returns ``(upserted, removed)`` host counts."""
+        profile = None
+        if name is not None:
+            profile = self._get(session, name)
+            if profile is None:
+                raise ValueError(f"Unknown profile: {name!r}")
+        profile_id = profile.id if profile is not None else None
+
+        blocker = self.site_blocker
+        if not blocker.snapshot.loaded:
+            blocker.load_snapshot(session)
+        overrides = (
+            self._load_overrides(session, profile_id)
+            if profile_id is not None
+            else ProfileOverrides()
+        )
+        effective = self._effective_set(session, profile_id, overrides)
+        counts = blocker.use_profile_overrides(
+            session, overrides.blocked, overrides.allowed, effective=effective
+        )
+
+        session.execute(
+            update(BlocklistProfile).values(
+                is_current=BlocklistProfile.id == profile_id
+            )
+        )
+        self.current_id = profile_id
+        self.current_name = profile.name if profile is not None else None
+        return counts
+
+    def block_site(
+        self, session: Session, name: str, url: str, redirect_ip: str = "127.0.0.1"
+    ) -> None:
+        """Block ``url`` for one profile only."""
+        self._set_override(session, name, url, OVERRIDE_BLOCK, redirect_ip)
+
+    def allow_site(self, session: Session, name: str, url: str) -> None:
+        """Exempt one profile from a base-list entry."""
+        self._set_override(session, name, url, OVERRIDE_ALLOW, "127.0.0.1")
+
+    def clear_override(self, session: Session, name: str, url: str) -> bool:
+        """Drop a profile's override so the base list applies again. Returns True if one existed."""
+        profile = self._require(session, name)
+        hostname = self.site_blocker._normalize_url(url)
+        result = session.execute(
+            delete(ProfileSiteOverride).where(
+                ProfileSiteOverride.profile_id == profile.id,
+                ProfileSiteOverride.url == hostname,
+            )
+        )
+        if not result.rowcount:
+            return False
+        self._overrides_changed(session, profile.id)
+        return True
+
+    def _set_override(
+        self, session: Session, name: str, url: str, action: str, redirect_ip: str
+    ) -> None:
+        profile = self._require(session, name)
+        hostname = self.site_blocker._normalize_url(url)
+        stmt = sqlite_insert(ProfileSiteOverride).values(
+            profile_id=profile.id,
+            url=hostname,
+            action=action,
+            redirect_ip=redirect_ip,
+        )
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[
+                    ProfileSiteOverride.profile_id,
+                    ProfileSiteOverride.url,
+                ],
+                set_={"action": action, "redirect_ip": redirect_ip},
+            )
+        )
+        self._overrides_changed(session, profile.id)
+
+    def _overrides_changed(self, session: Session, profile_id: int) -> None:
+        self._overrides.pop(profile_id, None)
+        self._effective.pop(profile_id, None)
+        if profile_id != self.current_id:
+            return
+        blocker = self.site_blocker
+        previous = (blocker.profile_blocked, blocker.profile_allowed)
+        try:
+            overrides = self._load_overrides(session, profile_id)
+            if not blocker.snapshot.loaded:
+                blocker.use_profile_overrides(
+                    session, overrides.blocked, overrides.allowed
+                )
+                blocker.apply_blocklist(session)
+                return
+            effective = self._effective_set(session, profile_id, overrides)
+            blocker.use_profile_overrides(
+                session, overrides.blocked, overrides.allowed, effective=effective
+            )
+        except SiteBlockerError:
+            # The caller's transaction rolls back, so neither the cache nor the blocker may keep this edit.
+            self._overrides.pop(profile_id, None)
+            self._effective.pop(profile_id, None)
+            blocker.profile_blocked, blocker.profile_allowed = previous
+            raise
+
+    def _effective_set(
+        self,
+        session: Session,
+        profile_id: int | None,
+        overrides: ProfileOverrides,
+    ) -> dict[str, str]:
+        base_version = self.site_blocker.base_version
+        cached = self._effective.get(profile_id)
+        if cached is not None and cached[0] == base_version:
+            return cached[1]
+        effective = overrides.apply(self.site_blocker.base_entries(session))
+        self._effective[profile_id] = (base_version, effective)
+        return effective
+
+    def _load_overrides(self, session: Session, profile_id: int) -> ProfileOverrides:
+        cached = self._overrides.get(profile_id)
+        if cached is not None:
+            return cached
+        blocked: dict[str, str] = {}
+        allowed: set[str] = set()
+        rows = session.execute(
+            select(
+                ProfileSiteOverride.url,
+                ProfileSiteOverride.action,
+                ProfileSiteOverride.redirect_ip,
+            ).where(ProfileSiteOverride.profile_id == profile_id)
+        )
+        for hostname, action, redirect_ip in rows:
+            if action == OVERRIDE_BLOCK:
+                blocked[hostname] = redirect_ip
+            else:
+                allowed.add(hostname)
+        overrides = ProfileOverrides(blocked=blocked, allowed=frozenset(allowed))
+        self._overrides[profile_id] = overrides
+        return overrides
+
+    def _get(self, session: Session, name: str) -> BlocklistProfile | None:
+        return session.scalars(
+            select(BlocklistProfile).where(BlocklistProfile.name == name.strip())
+        ).first()
+
+    def _require(self, session: Session, name: str) -> BlocklistProfile:
+        profile = self._get(session, name)
+        if profile is None:
+            raise ValueError(f"Unknown profile: {name!r}")
+        return profile
+
+
+__all__ = [
+    "BlocklistProfile",
+    "OVERRIDE_ALLOW",
+    "OVERRIDE_BLOCK",
+    "ProfileOverrides",
+    "ProfileService",
+    "ProfileSiteOverride",
+]
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import sys
+from bisect import bisect_left, insort
+from heapq import merge
+from typing import Iterable, Iterator
+
+
+class BlocklistSnapshot:
+    """Compact, version-stamped in-memory view of the active blocklist.
+
+    Hostnames are kept in a sorted list next to a hostname -> redirect IP
+    mapping, so readers get hosts-file ordering without touching the ORM.
+    Every effective change bumps ``version``; consumers compare it with the
+    last version they rendered to skip redundant work.
+    """
+
+    __slots__ = ("_version", "_loaded", "_hostnames", "_redirects")
+
+    def __init__(self) -> None:
+        self._version = 0
+        self._loaded = False
+        self._hostnames: list[str] = []
+        self._redirects: dict[str, str] = {}
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def __len__(self) -> int:
+        return len(self._hostnames)
+
+    def __contains__(self, hostname: object) -> bool:
+        return hostname in self._redirects
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._hostnames)
+
+    def redirect_ip(self, hostname: str) -> str | None:
+        return self._redirects.get(hostname)
+
+    def entries(self) -> Iterator[tuple[str, str]]:
+        """Yield ``(hostname, redirect_ip)`` pairs ordered by hostname."""
+        redirects = self._redirects
+        for hostname in self._hostnames:
+            yield hostname, redirects[hostname]
+
+    def load(self, rows: Iterable[tuple[str, str]]) -> None:
+        """Replace the snapshot contents with the provided rows."""
+        redirects = {
+            hostname: sys.intern(redirect_ip) for hostname, redirect_ip in rows
+        }
+        self._redirects = redirects
+        self._hostnames = sorted(redirects)
+        self._loaded = True
+        self._version += 1
+
+    def upsert(self, hostname: str, redirect_ip: str) -> bool:
+        """Add or update a hostname. Returns True if the snapshot changed."""
+        current = self._redirects.get(hostname)
+        if current == redirect_ip:
+            return False
+        if current is None:
+            insort(self._hostnames, hostname)
+        self._redirects[hostname] = sys.intern(redirect_ip)
+        self._version += 1
+        return True
+
+    def discard(self, hostname: str) -> bool:
+        """Remove a hostname if present. Returns True if the snapshot changed."""
+        if self._redirects.pop(hostname, None) is None:
+            return False
+        index = bisect_left(self._hostnames, hostname)
+        del self._hostnames[index]
+        self._version += 1
+        return True
+
+    def apply_delta(
+        self,
+        upserts: Iterable[tuple[str, str]],
+        removals: Iterable[str],
+    ) -> tuple[list[tuple[str, str]], list[str]]:
+        """Apply many changes at once, rebuilding the sorted index a single time.
+
+        Returns the upserts and removals that actually changed the snapshot;
+        ``version`` is bumped once if anything did. An upsert wins over a
+        removal of the same hostname.
+        """
+        redirects = self._redirects
+        changed: list[tuple[str, str]] = []
+        added: list[str] = []
+        for hostname, redirect_ip in upserts:
+            current = redirects.get(hostname)
+            if current == redirect_ip:
+                continue
+            if current is None:
+                added.append(hostname)
+            redirects[hostname] = sys.intern(redirect_ip)
+            changed.append((hostname, redirect_ip))
+
+        upserted = {hostname for hostname, _ in changed}
+        removed = [
+            hostname
+            for hostname in dict.fromkeys(removals)
+            if hostname not in upserted and redirects.pop(hostname, None) is not None
+        ]
+
+        if removed:
+            gone = set(removed)
+            kept: Iterable[str] = (
+                hostname for hostname in self._hostnames if hostname not in gone
+            )
+        else:
+            kept = self._hostnames
+        if added or removed:
+            self._hostnames = list(merge(kept, sorted(added))) if added else list(kept)
+        if changed or removed:
+            self._version += 1
+        return changed, removed
+
+    def invalidate(self) -> None:
+        """Mark the snapshot stale so the next reader reloads it from the DB."""
+        self._loaded = False
+        self._version += 1
+
+
+__all__ = ["BlocklistSnapshot"]
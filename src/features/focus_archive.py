@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, Sequence
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    Date,
+    DateTime,
+    Engine,
+    Integer,
+    MetaData,
+    Row,
+    Table,
+    delete,
+    exists,
+    func,
+    insert,
+    select,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.config.db import ENGINE, Base
+from src.features.focus_timer import FocusSession
+
+ARCHIVE_SCHEMA = "archive"
+
+_ARCHIVE_METADATA = MetaData(schema=ARCHIVE_SCHEMA)
+
+archived_focus_sessions = Table(
+    "focus_sessions",
+    _ARCHIVE_METADATA,
+    Column("id", Integer, primary_key=True),
+    Column("target_minutes", Integer, nullable=False),
+    Column("actual_seconds", Integer, nullable=False),
+    Column("started_at", DateTime(timezone=True), nullable=False),
+    Column("completed_at", DateTime(timezone=True), nullable=False, index=True),
+)
+
+_APPEND_ONLY_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS {ARCHIVE_SCHEMA}.focus_sessions_no_update "
+    "BEFORE UPDATE ON focus_sessions BEGIN SELECT RAISE(ABORT, 'archive is append-only'); END",
+    f"CREATE TRIGGER IF NOT EXISTS {ARCHIVE_SCHEMA}.focus_sessions_no_delete "
+    "BEFORE DELETE ON focus_sessions BEGIN SELECT RAISE(ABORT, 'archive is append-only'); END",
+)
+
+
+class FocusArchiveError(RuntimeError):
+    """Raised when the focus session archive cannot be used."""
+
+
+class FocusDailyRollup(Base):
+    """Per-day aggregates of focus sessions that were moved to the archive."""
+
+    __tablename__ = "focus_daily_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    session_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    target_minutes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    actual_seconds: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class FocusArchiveService:
+    """Moves old focus sessions into an append-only archive DB and reads across both tiers."""
+
+    def __init__(self, archive_path: str | Path, engine: Engine | None = None) -> None:
+        self.archive_path = Path(archive_path)
+        self.engine = engine or ENGINE
+
+    def archive_older_than(
+        self, horizon_days: int, *, now: datetime | None = None
+    ) -> int:
+        """Archive sessions completed before the horizon. Returns the number moved."""
+        if horizon_days <= 0:
+            raise ValueError("horizon_days must be greater than zero.")
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=horizon_days)
+        return self.archive_before(cutoff)
+
+    def archive_before(self, cutoff: datetime) -> int:
+        hot = FocusSession.__table__
+        expired = hot.c.completed_at < cutoff
+        columns = [column.name for column in archived_focus_sessions.columns]
+
+        with self._attached() as conn:
+            day = func.date(hot.c.completed_at)
+            rollups = conn.execute(
+                select(
+                    day,
+                    func.count(),
+                    func.sum(hot.c.target_minutes),
+                    func.sum(hot.c.actual_seconds),
+                )
+                .where(expired)
+                .group_by(day)
+            ).all()
+            if not rollups:
+                conn.rollback()
+                return 0
+
+            self._renumber_reused_ids(conn)
+            conn.execute(
+                insert(archived_focus_sessions).from_select(
+                    columns,
+                    select(*(hot.c[name] for name in columns)).where(expired),
+                )
+            )
+            upsert = sqlite_insert(FocusDailyRollup.__table__)
+            conn.execute(
+                upsert.on_conflict_do_update(
+                    index_elements=[FocusDailyRollup.day],
+                    set_={
+                        "session_count": FocusDailyRollup.session_count
+                        + upsert.excluded.session_count,
+                        "target_minutes": FocusDailyRollup.target_minutes
+                        + upsert.excluded.target_minutes,
+                        "actual_seconds": FocusDailyRollup.actual_seconds
+                        + upsert.excluded.actual_seconds,
+                    },
+                ),
+                [
+                    {
+                        "day": date.fromisoformat(row_day),
+                        "session_count": count,
+                        "target_minutes": minutes,
+                        "actual_seconds": seconds,
+                    }
+                    for row_day, count, minutes, seconds in rollups
+                ],
+            )
+            moved = conn.execute(delete(hot).where(expired)).rowcount
+            conn.commit()
+
+            # Compact the hot DB now that rows have left it; VACUUM must run outside a transaction.
+            # The append-only archive never frees pages, so vacuuming it would only rewrite the file.
+            conn.exec_driver_sql("VACUUM")
+            conn.exec_driver_sql("PRAGMA optimize")
+            conn.commit()
+        return moved
+
+    def _renumber_reused_ids(self, conn: Connection) -> None:
+        """Move hot rows off ids the archive already holds.
+
+        Hot tables created before ``sqlite_autoincrement`` hand ids out again once
+        every row has been archived; shifting the clashing rows past both tiers'
+        maximum keeps those databases archiving.
+        """
+        hot = FocusSession.__table__
+        reused = hot.c.id.in_(select(archived_focus_sessions.c.id))
+        if not conn.scalar(select(exists().where(reused))):
+            return
+        offset = conn.scalar(
+            select(
+                func.max(
+                    select(func.max(archived_focus_sessions.c.id)).scalar_subquery(),
+                    select(func.max(hot.c.id)).scalar_subquery(),
+                )
+            )
+        )
+        conn.execute(update(hot).where(reused).values(id=hot.c.id + offset))
+
+    def archived_through(self, conn: Connection | None = None) -> date | None:
+        """Return the latest day that has sessions in the archive, if any."""
+        stmt = select(func.max(FocusDailyRollup.day))
+        if conn is not None:
+            return conn.execute(stmt).scalar()
+        with self.engine.connect() as own_conn:
+            return own_conn.execute(stmt).scalar()
+
+    def sessions_between(self, start: datetime, end: datetime) -> Sequence[Row]:
+        """Return sessions completed in ``[start, end)``, attaching the archive only if needed."""
+        hot = FocusSession.__table__
+        hot_stmt = select(
+            hot.c.id,
+            hot.c.target_minutes,
+            hot.c.actual_seconds,
+            hot.c.started_at,
+            hot.c.completed_at,
+        ).where(hot.c.completed_at >= start, hot.c.completed_at < end)
+
+        with self.engine.connect() as conn:
+            archived_through = self.archived_through(conn)
+            if archived_through is None or start.date() > archived_through:
+                return conn.execute(
+                    hot_stmt.order_by(hot.c.completed_at, hot.c.id)
+                ).all()
+
+        cold = archived_focus_sessions
+        cold_stmt = select(
+            cold.c.id,
+            cold.c.target_minutes,
+            cold.c.actual_seconds,
+            cold.c.started_at,
+            cold.c.completed_at,
+        ).where(cold.c.completed_at >= start, cold.c.completed_at < end)
+        combined = union_all(cold_stmt, hot_stmt).subquery()
+        with self._attached() as conn:
+            return conn.execute(
+                select(combined).order_by(combined.c.completed_at, combined.c.id)
+            ).all()
+
+    def page_before(
+        self, cursor: tuple[datetime, int] | None, limit: int
+    ) -> Sequence[Row]:
+        """Return up to ``limit`` archived sessions older than ``cursor``, newest first."""
+        cold = archived_focus_sessions
+        stmt = select(
+            cold.c.id,
+            cold.c.target_minutes,
+            cold.c.actual_seconds,
+            cold.c.started_at,
+            cold.c.completed_at,
+        )
+        if cursor is not None:
+            stmt = stmt.where(tuple_(cold.c.completed_at, cold.c.id) < tuple_(*cursor))
+        stmt = stmt.order_by(cold.c.completed_at.desc(), cold.c.id.desc()).limit(limit)
+        with self._attached() as conn:
+            return conn.execute(stmt).all()
+
+    @contextmanager
+    def _attached(self) -> Iterator[Connection]:
+        with self.engine.connect() as conn:
+            try:
+                self.archive_path.parent.mkdir(parents=True, exist_ok=True)
+                conn.exec_driver_sql(
+                    f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (str(self.archive_path),)
+                )
+            except Exception as exc:
+                raise FocusArchiveError(
+                    f"Failed to attach archive {self.archive_path}: {exc}"
+                ) from exc
+
+            try:
+                _ARCHIVE_METADATA.create_all(conn)
+                for trigger in _APPEND_ONLY_TRIGGERS:
+                    conn.exec_driver_sql(trigger)
+                conn.commit()
+                yield conn
+            finally:
+                conn.rollback()
+                conn.exec_driver_sql(f"DETACH DATABASE {ARCHIVE_SCHEMA}")
+                conn.commit()
+
+
+__all__ = [
+    "ARCHIVE_SCHEMA",
+    "FocusArchiveError",
+    "FocusArchiveService",
+    "FocusDailyRollup",
+    "archived_focus_sessions",
+]
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Sequence
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+
+from src.features.focus_archive import FocusArchiveService, FocusDailyRollup
+from src.features.focus_timer import FocusSession
+
+
+@dataclass(slots=True, frozen=True)
+class FocusHistoryPage:
+    rows: list[tuple[int, int, int, datetime, datetime]]
+    cursor: tuple[datetime, int] | None
+
+    @property
+    def exhausted(self) -> bool:
+        return self.cursor is None
+
+
+class FocusHistoryService:
+    """Pages through focus sessions newest-first and builds daily trend series.
+
+    Pagination is keyset-based on ``(completed_at, id)`` so every page is an
+    index range scan regardless of depth. Once the hot table runs out, pages
+    continue into the archive tier when one is configured.
+    """
+
+    def __init__(self, archive: FocusArchiveService | None = None) -> None:
+        self.archive = archive
+
+    def page(
+        self,
+        session: Session,
+        cursor: tuple[datetime, int] | None = None,
+        limit: int = 200,
+    ) -> FocusHistoryPage:
+        if limit <= 0:
+            raise ValueError("limit must be greater than zero.")
+
+        stmt = select(
+            FocusSession.id,
+            FocusSession.target_minutes,
+            FocusSession.actual_seconds,
+            FocusSession.started_at,
+            FocusSession.completed_at,
+        )
+        if cursor is not None:
+            stmt = stmt.where(
+                tuple_(FocusSession.completed_at, FocusSession.id) < tuple_(*cursor)
+            )
+        stmt = stmt.order_by(
+            FocusSession.completed_at.desc(), FocusSession.id.desc()
+        ).limit(limit)
+        rows = [tuple(row) for row in session.execute(stmt)]
+
+        if self.archive is not None and self._needs_archive(session, rows, limit):
+            archived = [tuple(row) for row in self.archive.page_before(cursor, limit)]
+            rows = sorted(
+                rows + archived, key=lambda row: (row[4], row[0]), reverse=True
+            )[:limit]
+
+        next_cursor = (rows[-1][4], rows[-1][0]) if len(rows) == limit else None
+        return FocusHistoryPage(rows=rows, cursor=next_cursor)
+
+    def daily_seconds(
+        self, session: Session, start: date | None = None
+    ) -> list[tuple[date, int]]:
+        """Return total focused seconds per day, merging archived rollups with hot sessions."""
+        day = func.date(FocusSession.completed_at)
+        hot_stmt = select(day, func.sum(FocusSession.actual_seconds)).group_by(day)
+        rollup_stmt = select(FocusDailyRollup.day, FocusDailyRollup.actual_seconds)
+        if start is not None:
+            hot_stmt = hot_stmt.where(
+                FocusSession.completed_at
+                >= datetime.combine(start, datetime.min.time())
+            )
+            rollup_stmt = rollup_stmt.where(FocusDailyRollup.day >= start)
+
+        totals: dict[date, int] = {}
+        for rollup_day, seconds in session.execute(rollup_stmt):
+            totals[rollup_day] = totals.get(rollup_day, 0) + int(seconds)
+        for raw_day, seconds in session.execute(hot_stmt):
+            hot_day = date.fromisoformat(raw_day)
+            totals[hot_day] = totals.get(hot_day, 0) + int(seconds or 0)
+        return sorted(totals.items())
+
+    def _needs_archive(
+        self, session: Session, rows: Sequence[tuple], limit: int
+    ) -> bool:
+        archived_through = session.scalar(select(func.max(FocusDailyRollup.day)))
+        if archived_through is None:
+            return False
+        return len(rows) < limit or rows[-1][4].date() <= archived_through
+
+
+__all__ = ["FocusHistoryPage", "FocusHistoryService"]
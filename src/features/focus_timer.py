@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, Integer
+from sqlalchemy import DateTime, Index, Integer
 from sqlalchemy.orm import Mapped, Session, mapped_column
 
 from src.config.db import Base
@@ -13,6 +13,12 @@ class FocusSession(Base):
     """SQLAlchemy model capturing completed deep-focus sessions."""
 
     __tablename__ = "focus_sessions"
+    __table_args__ = (
+        # Backs keyset pagination and date-range reads over the history.
+        Index("ix_focus_sessions_completed_at_id", "completed_at", "id"),
+        # Ids must never be reused once sessions move to the archive, which keeps them.
+        {"sqlite_autoincrement": True},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     target_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,494 @@
+"""Long-lived privileged helper that owns all writes to the hosts file.
+
+The unprivileged GUI sends ``apply``/``add``/``remove`` commands over a local
+authenticated socket. The helper coalesces every command queued within one
+debounce window into a single hosts rewrite and acknowledges each command with
+the fingerprint of the resulting managed section.
+
+Messages are JSON objects framed with ``send_bytes``/``recv_bytes``; nothing
+received from the socket is ever unpickled. The shared secret is created by the
+helper itself, by default next to the hosts file where only administrators can
+write, so the unprivileged side can read it but never plant one.
+
+Run it with ``python -m src.features.hosts_helper --hosts PATH --port N [--key-file PATH]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import queue
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Any, Iterable
+
+from src.features.site_blocker import (
+    DEFAULT_HOSTNAMES_PER_LINE,
+    HOSTS_LAYOUT_LINE,
+    HOSTS_LAYOUT_PACKED,
+    HostEntry,
+    SiteBlocker,
+    SiteBlockerError,
+    hosts_fingerprint,
+    is_valid_hostname,
+    is_valid_redirect_ip,
+    parse_managed_entries,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_HELPER_PORT = 47811
+HELPER_KEY_NAME = "sbaas_helper.key"
+# Largest accepted command frame; a full apply of ~100k hostnames fits comfortably.
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+
+@dataclass(slots=True, frozen=True)
+class HostsAck:
+    command_id: int
+    fingerprint: str | None
+    error: str | None = None
+
+
+def default_key_path(hosts_path: str | Path) -> Path:
+    """Place the helper secret beside the hosts file, which only administrators may write."""
+    return Path(hosts_path).with_name(HELPER_KEY_NAME)
+
+
+def load_or_create_authkey(key_path: str | Path) -> bytes:
+    """Read the shared helper secret, creating it if missing. Only the helper calls this."""
+    path = Path(key_path)
+    if path.exists():
+        return path.read_bytes()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    key = secrets.token_bytes(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(key)
+    return key
+
+
+def read_authkey(key_path: str | Path) -> bytes:
+    """Read the secret the helper created; the GUI never creates one itself."""
+    try:
+        key = Path(key_path).read_bytes()
+    except OSError as exc:
+        raise SiteBlockerError(
+            f"Hosts helper key is not available at {key_path}: {exc}"
+        ) from exc
+    if not key:
+        raise SiteBlockerError(f"Hosts helper key at {key_path} is empty.")
+    return key
+
+
+def send_message(conn: Connection, message: dict[str, Any]) -> None:
+    conn.send_bytes(json.dumps(message, separators=(",", ":")).encode("utf-8"))
+
+
+def recv_message(conn: Connection) -> dict[str, Any]:
+    """Receive one JSON object; raises ``ValueError`` for anything else."""
+    message = json.loads(conn.recv_bytes(MAX_MESSAGE_BYTES).decode("utf-8"))
+    if not isinstance(message, dict):
+        raise ValueError("Hosts helper messages must be JSON objects.")
+    return message
+
+
+def validate_command(message: dict[str, Any]) -> None:
+    """Reject commands whose entries could inject anything but plain hosts lines."""
+    op = message.get("op")
+    if op in ("apply", "add"):
+        entries = message.get("entries", ())
+        if not isinstance(entries, list):
+            raise SiteBlockerError(f"{op} entries must be a list.")
+        for entry in entries:
+            if not (isinstance(entry, (list, tuple)) and len(entry) == 2):
+                raise SiteBlockerError(f"Malformed hosts entry: {entry!r}")
+            hostname, redirect_ip = entry
+            if not isinstance(hostname, str) or not is_valid_hostname(hostname):
+                raise SiteBlockerError(f"Invalid hostname: {hostname!r}")
+            if not isinstance(redirect_ip, str) or not is_valid_redirect_ip(
+                redirect_ip
+            ):
+                raise SiteBlockerError(f"Invalid redirect IP: {redirect_ip!r}")
+    elif op == "remove":
+        hostnames = message.get("hostnames", ())
+        if not isinstance(hostnames, list) or not all(
+            isinstance(hostname, str) for hostname in hostnames
+        ):
+            raise SiteBlockerError("remove hostnames must be a list of strings.")
+    else:
+        raise SiteBlockerError(f"Unknown hosts command: {op!r}")
+
+
+def _command_id(message: dict[str, Any]) -> int:
+    command_id = message.get("id", 0)
+    return command_id if isinstance(command_id, int) else 0
+
+
+class HostsWriterHelper:
+    """Applies queued hosts commands with one rewrite per debounce window."""
+
+    def __init__(
+        self,
+        hosts_path: str | Path,
+        debounce: float = 0.25,
+        hosts_layout: str = HOSTS_LAYOUT_LINE,
+        hostnames_per_line: int = DEFAULT_HOSTNAMES_PER_LINE,
+    ) -> None:
+        self.blocker = SiteBlocker(
+            hosts_path=hosts_path,
+            hosts_layout=hosts_layout,
+            hostnames_per_line=hostnames_per_line,
+        )
+        self.debounce = debounce
+        self.state: dict[str, str] = {
+            entry.hostname: entry.redirect_ip
+            for entry in parse_managed_entries(self.blocker._read_hosts_lines())
+        }
+        self.writes = 0
+        self._commands: queue.Queue[tuple[Connection | None, dict[str, Any]]] = (
+            queue.Queue()
+        )
+        self._send_lock = threading.Lock()
+
+    def submit(self, conn: Connection | None, message: dict[str, Any]) -> None:
+        self._commands.put((conn, message))
+
+    def process_batch(self, messages: Iterable[dict[str, Any]]) -> str:
+        """Fold commands into the in-memory state and write the hosts file once."""
+        messages = list(messages)
+        for message in messages:
+            validate_command(message)
+        for message in messages:
+            op = message.get("op")
+            if op == "apply":
+                self.state = {
+                    hostname: redirect_ip
+                    for hostname, redirect_ip in message.get("entries", ())
+                }
+            elif op == "add":
+                self.state.update(
+                    (hostname, redirect_ip)
+                    for hostname, redirect_ip in message.get("entries", ())
+                )
+            elif op == "remove":
+                for hostname in message.get("hostnames", ()):
+                    self.state.pop(hostname, None)
+
+        entries = [
+            HostEntry(hostname=hostname, redirect_ip=self.state[hostname])
+            for hostname in sorted(self.state)
+        ]
+        self.blocker._rewrite_hosts_file(entries)
+        self.writes += 1
+        return hosts_fingerprint(entries)
+
+    def run_writer(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                first = self._commands.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self.debounce
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._commands.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            fingerprint: str | None = None
+            error: str | None = None
+            try:
+                fingerprint = self.process_batch(message for _conn, message in batch)
+            except SiteBlockerError as exc:
+                error = str(exc)
+                _LOGGER.error("Hosts write failed: %s", exc)
+
+            for conn, message in batch:
+                if conn is not None:
+                    self._acknowledge(
+                        conn, HostsAck(_command_id(message), fingerprint, error)
+                    )
+
+    def serve(self, listener: Listener, stop: threading.Event | None = None) -> None:
+        """Accept GUI connections until ``stop`` is set."""
+        stop = stop or threading.Event()
+        threading.Thread(
+            target=self.run_writer, args=(stop,), name="hosts-writer", daemon=True
+        ).start()
+        while not stop.is_set():
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                if stop.is_set():
+                    break
+                _LOGGER.warning("Rejected hosts helper connection", exc_info=True)
+                continue
+            threading.Thread(
+                target=self._read_commands,
+                args=(conn,),
+                name="hosts-reader",
+                daemon=True,
+            ).start()
+
+    def _read_commands(self, conn: Connection) -> None:
+        with conn:
+            while True:
+                try:
+                    message = recv_message(conn)
+                except (EOFError, OSError):
+                    return
+                except ValueError:
+                    _LOGGER.warning(
+                        "Dropping hosts helper connection after a malformed message"
+                    )
+                    return
+                try:
+                    validate_command(message)
+                except SiteBlockerError as exc:
+                    # Reject up front so one bad command cannot fail a whole debounce batch.
+                    _LOGGER.warning("Rejected hosts command: %s", exc)
+                    self._acknowledge(
+                        conn, HostsAck(_command_id(message), None, str(exc))
+                    )
+                    continue
+                self.submit(conn, message)
+
+    def _acknowledge(self, conn: Connection, ack: HostsAck) -> None:
+        try:
+            with self._send_lock:
+                send_message(
+                    conn,
+                    {
+                        "id": ack.command_id,
+                        "fingerprint": ack.fingerprint,
+                        "error": ack.error,
+                    },
+                )
+        except (OSError, ValueError):
+            pass  # The GUI went away; the write itself already happened.
+
+
+class HostsWriterClient:
+    """GUI-side handle that queues hosts commands for the helper without blocking."""
+
+    def __init__(self, conn: Connection) -> None:
+        self._conn = conn
+        self._next_id = 0
+        self._acks: dict[int, HostsAck] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self.last_ack: HostsAck | None = None
+        threading.Thread(
+            target=self._read_acks, name="hosts-writer-acks", daemon=True
+        ).start()
+
+    @classmethod
+    def connect(
+        cls, address: tuple[str, int], authkey: bytes, timeout: float = 5.0
+    ) -> HostsWriterClient:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return cls(Client(address, authkey=authkey))
+            except AuthenticationError as exc:
+                raise SiteBlockerError(
+                    f"Hosts helper rejected our credentials: {exc}"
+                ) from exc
+            except (OSError, EOFError) as exc:
+                if time.monotonic() >= deadline:
+                    raise SiteBlockerError(
+                        f"Hosts helper is not reachable at {address}: {exc}"
+                    ) from exc
+                time.sleep(0.1)
+
+    def apply(self, entries: Iterable[HostEntry]) -> int:
+        return self._send(
+            "apply", entries=[(entry.hostname, entry.redirect_ip) for entry in entries]
+        )
+
+    def add(self, entries: Iterable[HostEntry]) -> int:
+        return self._send(
+            "add", entries=[(entry.hostname, entry.redirect_ip) for entry in entries]
+        )
+
+    def remove(self, hostnames: Iterable[str]) -> int:
+        return self._send("remove", hostnames=list(hostnames))
+
+    def wait(self, command_id: int | None = None, timeout: float = 5.0) -> HostsAck:
+        """Block until a command (default: the latest) is acknowledged."""
+        target = self._next_id if command_id is None else command_id
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while target not in self._acks:
+                remaining = deadline - time.monotonic()
+                if self._closed or remaining <= 0:
+                    raise SiteBlockerError(
+                        "Hosts helper did not acknowledge the update."
+                    )
+                self._cond.wait(remaining)
+            ack = self._acks[target]
+        if ack.error:
+            raise SiteBlockerError(ack.error)
+        return ack
+
+    def close(self) -> None:
+        self._closed = True
+        self._conn.close()
+
+    def _send(self, op: str, **payload: Any) -> int:
+        with self._cond:
+            self._next_id += 1
+            command_id = self._next_id
+        try:
+            send_message(self._conn, {"id": command_id, "op": op, **payload})
+        except (OSError, ValueError) as exc:
+            raise SiteBlockerError(f"Hosts helper connection lost: {exc}") from exc
+        return command_id
+
+    def _read_acks(self) -> None:
+        while True:
+            try:
+                message = recv_message(self._conn)
+                ack = HostsAck(
+                    int(message["id"]), message.get("fingerprint"), message.get("error")
+                )
+            except (EOFError, OSError, ValueError, KeyError, TypeError):
+                break
+            if ack.error:
+                _LOGGER.error(
+                    "Hosts helper rejected update %d: %s", ack.command_id, ack.error
+                )
+            with self._cond:
+                # Only the most recent acks matter to callers; keep the map bounded.
+                if len(self._acks) > 256:
+                    self._acks.clear()
+                self._acks[ack.command_id] = ack
+                self.last_ack = ack
+                self._cond.notify_all()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+def launch_helper(
+    hosts_path: Path,
+    port: int,
+    key_path: Path,
+    working_dir: Path,
+    hosts_layout: str = HOSTS_LAYOUT_LINE,
+    hostnames_per_line: int = DEFAULT_HOSTNAMES_PER_LINE,
+) -> None:
+    """Start the helper detached, asking Windows for elevation when needed."""
+    args = [
+        "-m",
+        "src.features.hosts_helper",
+        "--hosts",
+        str(hosts_path),
+        "--port",
+        str(port),
+        "--key-file",
+        str(key_path),
+        "--layout",
+        hosts_layout,
+        "--hostnames-per-line",
+        str(hostnames_per_line),
+    ]
+    if os.name == "nt":  # pragma: no cover - Windows only
+        import ctypes
+
+        params = subprocess.list2cmdline(args)
+        result = ctypes.windll.shell32.ShellExecuteW(
+            None, "runas", sys.executable, params, str(working_dir), 0
+        )
+        if result <= 32:
+            raise SiteBlockerError(
+                "Administrator approval for the hosts helper was declined."
+            )
+        return
+
+    subprocess.Popen(
+        [sys.executable, *args],
+        cwd=working_dir,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def ensure_helper(
+    hosts_path: Path,
+    port: int,
+    key_path: Path,
+    working_dir: Path,
+    hosts_layout: str = HOSTS_LAYOUT_LINE,
+    hostnames_per_line: int = DEFAULT_HOSTNAMES_PER_LINE,
+) -> HostsWriterClient:
+    """Connect to a running helper, launching one first if nothing is listening."""
+    address = ("127.0.0.1", port)
+    try:
+        return HostsWriterClient.connect(address, read_authkey(key_path), timeout=0.3)
+    except SiteBlockerError:
+        pass
+    launch_helper(
+        hosts_path, port, key_path, working_dir, hosts_layout, hostnames_per_line
+    )
+
+    # The freshly started helper creates the key before it starts listening.
+    deadline = time.monotonic() + 15.0
+    while True:
+        try:
+            authkey = read_authkey(key_path)
+        except SiteBlockerError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.1)
+            continue
+        return HostsWriterClient.connect(
+            address, authkey, timeout=max(deadline - time.monotonic(), 0.1)
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="SBAAS hosts file writer")
+    parser.add_argument("--hosts", required=True, type=Path)
+    parser.add_argument("--port", type=int, default=DEFAULT_HELPER_PORT)
+    parser.add_argument("--key-file", type=Path, default=None)
+    parser.add_argument("--debounce", type=float, default=0.25)
+    parser.add_argument(
+        "--layout",
+        choices=(HOSTS_LAYOUT_LINE, HOSTS_LAYOUT_PACKED),
+        default=HOSTS_LAYOUT_LINE,
+    )
+    parser.add_argument(
+        "--hostnames-per-line", type=int, default=DEFAULT_HOSTNAMES_PER_LINE
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    authkey = load_or_create_authkey(args.key_file or default_key_path(args.hosts))
+    helper = HostsWriterHelper(
+        args.hosts,
+        debounce=args.debounce,
+        hosts_layout=args.layout,
+        hostnames_per_line=args.hostnames_per_line,
+    )
+    with Listener(("127.0.0.1", args.port), authkey=authkey) as listener:
+        helper.serve(listener)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,57 @@
 from __future__ import annotations
 
+import hashlib
+import ipaddress
+import re
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Iterable
+from typing import TYPE_CHECKING, Iterable, Iterator, Mapping
 from urllib.parse import urlparse
 
-from sqlalchemy import Boolean, DateTime, Integer, String, select
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    Select,
+    String,
+    Table,
+    delete,
+    exists,
+    false,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Mapped, Session, mapped_column
 
 from src.config.db import Base
+from src.features.blocklist_snapshot import BlocklistSnapshot
+from src.utils.file_lock import FileLock, FileLockTimeout
+
+if TYPE_CHECKING:
+    from src.features.hosts_helper import HostsWriterClient
 
 
 DEFAULT_HOSTS_PATH = Path(r"C:\Windows\System32\drivers\etc\hosts")
 HOSTS_MARKER = "# SBAAS_BLOCK"
+HOSTS_LAYOUT_LINE = "line"
+HOSTS_LAYOUT_PACKED = "packed"
+# The Windows resolver ignores hostnames past the ninth on a single hosts line.
+DEFAULT_HOSTNAMES_PER_LINE = 9
+# Keeps IN (...) lists well below SQLite's bound-parameter limit.
+_SQL_CHUNK_SIZE = 500
+_HOSTNAME_LABEL = r"[a-z0-9_](?:[a-z0-9_-]{0,61}[a-z0-9_])?"
+_HOSTNAME_RE = re.compile(
+    rf"{_HOSTNAME_LABEL}(?:\.{_HOSTNAME_LABEL})*", re.ASCII | re.IGNORECASE
+)
 
 
 class SiteBlockerError(RuntimeError):
@@ -26,9 +64,57 @@ class BlockedSite(Base):
     __tablename__ = "blocked_sites"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    url: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
-    redirect_ip: Mapped[str] = mapped_column(String(45), default="127.0.0.1", nullable=False)
+    url: Mapped[str] = mapped_column(
+        String(255), unique=True, index=True, nullable=False
+    )
+    redirect_ip: Mapped[str] = mapped_column(
+        String(45), default="127.0.0.1", nullable=False
+    )
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    # Blocked by the user directly; subscription removals leave it alone.
+    is_manual: Mapped[bool] = mapped_column(
+        Boolean,
+        default=False,
+        server_default=false(),
+        nullable=False,
+        # Before this column existed, only rows without a source link were added by hand.
+        info={
+            "backfill": "UPDATE blocked_sites SET is_manual = 1 "
+            "WHERE id NOT IN (SELECT site_id FROM blocked_site_sources)"
+        },
+    )
+    # Removed by the user; subscription syncs must not re-enable it.
+    is_excluded: Mapped[bool] = mapped_column(
+        Boolean,
+        default=False,
+        server_default=false(),
+        nullable=False,
+        info={
+            "backfill": "UPDATE blocked_sites SET is_excluded = 1 "
+            "WHERE is_active = 0 AND id NOT IN (SELECT site_id FROM blocked_site_sources)"
+        },
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+
+class BlocklistSource(Base):
+    """SQLAlchemy model for a subscribed blocklist file."""
+
+    __tablename__ = "blocklist_sources"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    location: Mapped[str] = mapped_column(String(1024), unique=True, nullable=False)
+    redirect_ip: Mapped[str] = mapped_column(
+        String(45), default="127.0.0.1", nullable=False
+    )
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    last_synced_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
@@ -36,6 +122,72 @@ class BlockedSite(Base):
     )
 
 
+# Tags each blocked site with the subscription sources that currently list it.
+blocked_site_sources = Table(
+    "blocked_site_sources",
+    Base.metadata,
+    Column(
+        "source_id",
+        ForeignKey("blocklist_sources.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "site_id",
+        ForeignKey("blocked_sites.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    ),
+)
+
+
+class BlocklistCategory(Base):
+    """SQLAlchemy model grouping blocked sites that are toggled together."""
+
+    __tablename__ = "blocklist_categories"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+
+blocked_site_categories = Table(
+    "blocked_site_categories",
+    Base.metadata,
+    Column(
+        "category_id",
+        ForeignKey("blocklist_categories.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "site_id",
+        ForeignKey("blocked_sites.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    ),
+)
+
+
+@dataclass(slots=True, frozen=True)
+class CategorySummary:
+    name: str
+    is_active: bool
+    site_count: int
+
+
+@dataclass(slots=True, frozen=True)
+class SourceSyncResult:
+    location: str
+    added: int
+    removed: int
+    skipped: bool
+    error: str | None = None
+
+
 @dataclass(slots=True, frozen=True)
 class HostEntry:
     hostname: str
@@ -45,13 +197,97 @@ class HostEntry:
         return f"{self.redirect_ip}\t{self.hostname}\t{HOSTS_MARKER}"
 
 
+def render_hosts_lines(
+    entries: Iterable[HostEntry],
+    layout: str = HOSTS_LAYOUT_LINE,
+    hostnames_per_line: int = DEFAULT_HOSTNAMES_PER_LINE,
+) -> list[str]:
+    """Render managed entries one per line, or packed by redirect IP with one marker per line."""
+    if layout == HOSTS_LAYOUT_LINE:
+        return [entry.render() for entry in entries]
+    if layout != HOSTS_LAYOUT_PACKED:
+        raise ValueError(f"Unknown hosts layout: {layout!r}")
+    if hostnames_per_line <= 0:
+        raise ValueError("hostnames_per_line must be greater than zero.")
+
+    grouped: dict[str, list[str]] = {}
+    for entry in entries:
+        grouped.setdefault(entry.redirect_ip, []).append(entry.hostname)
+
+    lines: list[str] = []
+    for redirect_ip, hostnames in grouped.items():
+        for start in range(0, len(hostnames), hostnames_per_line):
+            packed = " ".join(hostnames[start : start + hostnames_per_line])
+            lines.append(f"{redirect_ip}\t{packed}\t{HOSTS_MARKER}")
+    return lines
+
+
+def is_managed_line(line: str) -> bool:
+    """Return True for hosts lines written by SBAAS in either layout."""
+    return line.rstrip().endswith(HOSTS_MARKER)
+
+
+def parse_managed_entries(lines: Iterable[str]) -> list[HostEntry]:
+    """Recover the SBAAS-managed entries from hosts file lines in either layout."""
+    entries: list[HostEntry] = []
+    for line in lines:
+        if not is_managed_line(line):
+            continue
+        tokens = line.split("#", 1)[0].split()
+        if len(tokens) < 2:
+            continue
+        redirect_ip = tokens[0]
+        entries.extend(
+            HostEntry(hostname=hostname, redirect_ip=redirect_ip)
+            for hostname in tokens[1:]
+        )
+    return entries
+
+
+def hosts_fingerprint(entries: Iterable[HostEntry]) -> str:
+    """Return a stable digest of the managed hosts section for the given entries."""
+    digest = hashlib.sha256()
+    for entry in entries:
+        digest.update(f"{entry.redirect_ip} {entry.hostname}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
 class SiteBlocker:
     """Coordinates database state with the Windows hosts file."""
 
-    def __init__(self, hosts_path: str | Path | None = None) -> None:
+    def __init__(
+        self,
+        hosts_path: str | Path | None = None,
+        lock_timeout: float = 5.0,
+        hosts_writer: HostsWriterClient | None = None,
+        hosts_layout: str = HOSTS_LAYOUT_LINE,
+        hostnames_per_line: int = DEFAULT_HOSTNAMES_PER_LINE,
+    ) -> None:
+        if hosts_layout not in (HOSTS_LAYOUT_LINE, HOSTS_LAYOUT_PACKED):
+            raise ValueError(f"Unknown hosts layout: {hosts_layout!r}")
+        if hostnames_per_line <= 0:
+            raise ValueError("hostnames_per_line must be greater than zero.")
         self.hosts_path = Path(hosts_path) if hosts_path else DEFAULT_HOSTS_PATH
+        self.hosts_layout = hosts_layout
+        self.hostnames_per_line = hostnames_per_line
+        self.snapshot = BlocklistSnapshot()
+        # Overrides of the active profile layered over the shared base list.
+        self.profile_blocked: dict[str, str] = {}
+        self.profile_allowed: frozenset[str] = frozenset()
+        # Bumped whenever the shared base list may have changed.
+        self.base_version = 0
+        self._base_cache: tuple[int, dict[str, str]] | None = None
+        # When set, hosts writes are delegated to the privileged helper process.
+        self.hosts_writer = hosts_writer
+        # Serializes hosts rewrites across every process running SBAAS.
+        self.hosts_lock = FileLock(
+            self.hosts_path.with_name(f"{self.hosts_path.name}.sbaas.lock"),
+            timeout=lock_timeout,
+        )
 
-    def add_site(self, session: Session, url: str, redirect_ip: str = "127.0.0.1") -> BlockedSite:
+    def add_site(
+        self, session: Session, url: str, redirect_ip: str = "127.0.0.1"
+    ) -> BlockedSite:
         """Ensure a site is blocked both in the DB and hosts file."""
         hostname = self._normalize_url(url)
         stmt = select(BlockedSite).where(BlockedSite.url == hostname)
@@ -60,12 +296,14 @@ class SiteBlocker:
         if site:
             site.redirect_ip = redirect_ip
             site.is_active = True
+            site.is_manual = True
+            site.is_excluded = False
         else:
-            site = BlockedSite(url=hostname, redirect_ip=redirect_ip)
+            site = BlockedSite(url=hostname, redirect_ip=redirect_ip, is_manual=True)
             session.add(site)
 
         session.flush()
-        self.apply_blocklist(session)
+        self._refresh_snapshot(session, [hostname])
         return site
 
     def remove_site(self, session: Session, url: str) -> bool:
@@ -78,20 +316,447 @@ class SiteBlocker:
             return False
 
         site.is_active = False
+        site.is_manual = False
+        site.is_excluded = True
         session.flush()
-        self.apply_blocklist(session)
+        self._refresh_snapshot(session, [hostname])
         return True
 
+    def add_source(
+        self, session: Session, location: str | Path, redirect_ip: str = "127.0.0.1"
+    ) -> BlocklistSource:
+        """Register a blocklist file as a subscription source (idempotent)."""
+        resolved = str(Path(location).expanduser().resolve())
+        source = session.scalars(
+            select(BlocklistSource).where(BlocklistSource.location == resolved)
+        ).first()
+        if source is None:
+            source = BlocklistSource(location=resolved, redirect_ip=redirect_ip)
+            session.add(source)
+            session.flush()
+        return source
+
+    def reconcile_sources(
+        self,
+        session: Session,
+        locations: Iterable[str | Path],
+        redirect_ip: str = "127.0.0.1",
+    ) -> list[str]:
+        """Make the subscribed sources match ``locations``. Returns the locations dropped."""
+        wanted = {str(Path(location).expanduser().resolve()) for location in locations}
+        dropped: list[str] = []
+        touched: set[str] = set()
+        for source in session.scalars(
+            select(BlocklistSource).order_by(BlocklistSource.id)
+        ).all():
+            if source.location in wanted:
+                wanted.discard(source.location)
+                continue
+            touched.update(self._unlink_source(session, source.id))
+            session.delete(source)
+            dropped.append(source.location)
+        for location in sorted(wanted):
+            self.add_source(session, location, redirect_ip)
+
+        session.flush()
+        if touched:
+            self._refresh_snapshot(session, touched)
+        return dropped
+
+    def sync_sources(self, session: Session) -> list[SourceSyncResult]:
+        """Apply content changes of every subscription with a single hosts update.
+
+        An unreadable source is reported in its result and skipped; the others still sync.
+        """
+        results: list[SourceSyncResult] = []
+        touched: set[str] = set()
+        for source in session.scalars(
+            select(BlocklistSource).order_by(BlocklistSource.id)
+        ).all():
+            results.append(self._sync_source(session, source, touched))
+
+        if touched:
+            self._refresh_snapshot(session, touched)
+        return results
+
+    def _sync_source(
+        self, session: Session, source: BlocklistSource, touched: set[str]
+    ) -> SourceSyncResult:
+        try:
+            data = Path(source.location).read_bytes()
+        except OSError as exc:
+            return SourceSyncResult(
+                location=source.location,
+                added=0,
+                removed=0,
+                skipped=True,
+                error=f"Failed to read blocklist source {source.location}: {exc}",
+            )
+
+        digest = hashlib.sha256(data).hexdigest()
+        if digest == source.content_hash:
+            return SourceSyncResult(
+                location=source.location, added=0, removed=0, skipped=True
+            )
+
+        wanted = self._parse_source(data.decode("utf-8", errors="replace"))
+        stored = set(
+            session.scalars(
+                select(BlockedSite.url)
+                .join(
+                    blocked_site_sources,
+                    blocked_site_sources.c.site_id == BlockedSite.id,
+                )
+                .where(blocked_site_sources.c.source_id == source.id)
+            )
+        )
+        added = wanted - stored
+        removed = stored - wanted
+        sites = BlockedSite.__table__
+
+        now = datetime.now(timezone.utc)
+        for chunk in _chunked(sorted(added), _SQL_CHUNK_SIZE):
+            upsert = sqlite_insert(sites)
+            session.execute(
+                # Sites the user removed stay inactive even when a source lists them.
+                upsert.on_conflict_do_update(
+                    index_elements=[sites.c.url],
+                    set_={"is_active": ~sites.c.is_excluded},
+                ),
+                [
+                    {
+                        "url": hostname,
+                        "redirect_ip": source.redirect_ip,
+                        "is_active": True,
+                        "created_at": now,
+                    }
+                    for hostname in chunk
+                ],
+            )
+            session.execute(
+                insert(blocked_site_sources).from_select(
+                    ["source_id", "site_id"],
+                    select(literal(source.id), sites.c.id).where(
+                        sites.c.url.in_(chunk)
+                    ),
+                )
+            )
+
+        self._unlink_source(session, source.id, removed)
+
+        source.content_hash = digest
+        source.last_synced_at = now
+        session.flush()
+        touched.update(added)
+        touched.update(removed)
+        return SourceSyncResult(
+            location=source.location,
+            added=len(added),
+            removed=len(removed),
+            skipped=False,
+        )
+
+    def _unlink_source(
+        self, session: Session, source_id: int, hostnames: Iterable[str] | None = None
+    ) -> set[str]:
+        """Detach a source from ``hostnames`` (all of its sites when None) and return them.
+
+        Sites left unclaimed by any source and not blocked by hand are deactivated.
+        """
+        sites = BlockedSite.__table__
+        if hostnames is None:
+            hostnames = session.scalars(
+                select(sites.c.url)
+                .join(
+                    blocked_site_sources, blocked_site_sources.c.site_id == sites.c.id
+                )
+                .where(blocked_site_sources.c.source_id == source_id)
+            ).all()
+        unlinked = set(hostnames)
+
+        for chunk in _chunked(sorted(unlinked), _SQL_CHUNK_SIZE):
+            site_ids = (
+                select(sites.c.id).where(sites.c.url.in_(chunk)).scalar_subquery()
+            )
+            session.execute(
+                delete(blocked_site_sources).where(
+                    blocked_site_sources.c.source_id == source_id,
+                    blocked_site_sources.c.site_id.in_(site_ids),
+                )
+            )
+            # Domains still listed by another source or blocked by hand stay blocked.
+            session.execute(
+                update(sites)
+                .where(
+                    sites.c.url.in_(chunk),
+                    sites.c.is_manual.is_(False),
+                    ~exists().where(blocked_site_sources.c.site_id == sites.c.id),
+                )
+                .values(is_active=False)
+            )
+        return unlinked
+
+    def _parse_source(self, text: str) -> set[str]:
+        """Collect hostnames from plain domain lists or hosts-file formatted sources."""
+        hostnames: set[str] = set()
+        for raw_line in text.splitlines():
+            for token in raw_line.split("#", 1)[0].split():
+                if _is_ip_address(token):
+                    continue
+                try:
+                    hostname = self._normalize_url(token)
+                except SiteBlockerError:
+                    continue
+                if hostname != "localhost":
+                    hostnames.add(hostname)
+        return hostnames
+
+    def add_category(self, session: Session, name: str) -> BlocklistCategory:
+        """Return the named category, creating it if needed."""
+        cleaned = name.strip().lower()
+        if not cleaned:
+            raise SiteBlockerError("Category name cannot be empty.")
+        category = session.scalars(
+            select(BlocklistCategory).where(BlocklistCategory.name == cleaned)
+        ).first()
+        if category is None:
+            category = BlocklistCategory(name=cleaned)
+            session.add(category)
+            session.flush()
+        return category
+
+    def assign_category(
+        self,
+        session: Session,
+        name: str,
+        urls: Iterable[str],
+        redirect_ip: str = "127.0.0.1",
+    ) -> int:
+        """Link domains to a category in bulk, creating missing sites. Returns the domain count."""
+        category = self.add_category(session, name)
+        hostnames = sorted({self._normalize_url(url) for url in urls})
+        sites = BlockedSite.__table__
+
+        now = datetime.now(timezone.utc)
+        for chunk in _chunked(hostnames, _SQL_CHUNK_SIZE):
+            session.execute(
+                sqlite_insert(sites).on_conflict_do_nothing(
+                    index_elements=[sites.c.url]
+                ),
+                [
+                    {
+                        "url": hostname,
+                        "redirect_ip": redirect_ip,
+                        "is_active": True,
+                        "is_manual": True,
+                        "created_at": now,
+                    }
+                    for hostname in chunk
+                ],
+            )
+            session.execute(
+                insert(blocked_site_categories)
+                .prefix_with("OR IGNORE")
+                .from_select(
+                    ["category_id", "site_id"],
+                    select(literal(category.id), sites.c.id).where(
+                        sites.c.url.in_(chunk)
+                    ),
+                )
+            )
+
+        self._refresh_snapshot(session, hostnames)
+        return len(hostnames)
+
+    def set_category_active(self, session: Session, name: str, active: bool) -> bool:
+        """Toggle a whole category with one UPDATE and one hosts update. Returns True if it exists."""
+        categories = BlocklistCategory.__table__
+        result = session.execute(
+            update(categories)
+            .where(categories.c.name == name.strip().lower())
+            .values(is_active=active)
+        )
+        if not result.rowcount:
+            return False
+        self._refresh_snapshot(session, None)
+        return True
+
+    def list_categories(self, session: Session) -> list[CategorySummary]:
+        stmt = (
+            select(
+                BlocklistCategory.name,
+                BlocklistCategory.is_active,
+                func.count(blocked_site_categories.c.site_id),
+            )
+            .outerjoin(
+                blocked_site_categories,
+                blocked_site_categories.c.category_id == BlocklistCategory.id,
+            )
+            .group_by(BlocklistCategory.id)
+            .order_by(BlocklistCategory.name)
+        )
+        return [
+            CategorySummary(name=name, is_active=is_active, site_count=count)
+            for name, is_active, count in session.execute(stmt)
+        ]
+
     def apply_blocklist(self, session: Session) -> None:
         """Rewrite hosts file to match active blocked sites."""
-        stmt = (
-            select(BlockedSite)
-            .where(BlockedSite.is_active.is_(True))
-            .order_by(BlockedSite.url)
+        self.load_snapshot(session)
+        self._write_snapshot()
+
+    def load_snapshot(self, session: Session) -> BlocklistSnapshot:
+        """Rebuild the shared snapshot from the database and return it."""
+        self.base_version += 1
+        base = dict(session.execute(self._active_rows_statement()).all())
+        self._base_cache = (self.base_version, base)
+        self.snapshot.load(self.overlay(base).items())
+        return self.snapshot
+
+    def base_entries(self, session: Session) -> dict[str, str]:
+        """Return the shared base list (before profile overrides), cached until it changes."""
+        if self._base_cache is None or self._base_cache[0] != self.base_version:
+            self._base_cache = (
+                self.base_version,
+                dict(session.execute(self._active_rows_statement()).all()),
+            )
+        return self._base_cache[1]
+
+    def overlay(self, base: Mapping[str, str]) -> dict[str, str]:
+        """Layer the active profile's overrides over ``base``."""
+        return overlay_entries(base, self.profile_blocked, self.profile_allowed)
+
+    def use_profile_overrides(
+        self,
+        session: Session,
+        blocked: Mapping[str, str],
+        allowed: Iterable[str],
+        effective: Mapping[str, str] | None = None,
+    ) -> tuple[int, int]:
+        """Switch the active overrides and apply only the resulting delta to hosts.
+
+        ``effective`` may carry a precomputed effective set for these overrides.
+        Returns ``(upserted, removed)`` counts. Before the snapshot is loaded the
+        overrides are only recorded and take effect on the next full apply. If
+        the hosts update fails the previous overrides are put back.
+        """
+        previous = (self.profile_blocked, self.profile_allowed)
+        self.profile_blocked = dict(blocked)
+        self.profile_allowed = frozenset(allowed)
+        if not self.snapshot.loaded:
+            return 0, 0
+
+        target = (
+            effective
+            if effective is not None
+            else self.overlay(self.base_entries(session))
+        )
+        changed, removed = self.snapshot.apply_delta(
+            target.items(),
+            [hostname for hostname in self.snapshot if hostname not in target],
+        )
+        upserted = [
+            HostEntry(hostname=hostname, redirect_ip=redirect_ip)
+            for hostname, redirect_ip in changed
+        ]
+        try:
+            self._publish(upserted, removed)
+        except SiteBlockerError:
+            # _publish already invalidated the snapshot; the next load uses these overrides.
+            self.profile_blocked, self.profile_allowed = previous
+            raise
+        return len(upserted), len(removed)
+
+    def _active_rows_statement(
+        self, hostnames: Iterable[str] | None = None
+    ) -> Select[tuple[str, str]]:
+        """Select the effective blocklist: active sites not switched off by all of their categories."""
+        links = blocked_site_categories
+        categorized = exists().where(links.c.site_id == BlockedSite.id)
+        in_active_category = (
+            exists()
+            .where(links.c.site_id == BlockedSite.id)
+            .where(links.c.category_id == BlocklistCategory.id)
+            .where(BlocklistCategory.is_active.is_(True))
         )
-        active_sites = session.scalars(stmt).all()
-        entries = [HostEntry(hostname=site.url, redirect_ip=site.redirect_ip) for site in active_sites]
-        self._rewrite_hosts_file(entries)
+        stmt = select(BlockedSite.url, BlockedSite.redirect_ip).where(
+            BlockedSite.is_active.is_(True),
+            or_(~categorized, in_active_category),
+        )
+        if hostnames is not None:
+            stmt = stmt.where(BlockedSite.url.in_(list(hostnames)))
+        return stmt
+
+    def _refresh_snapshot(
+        self, session: Session, hostnames: Iterable[str] | None
+    ) -> None:
+        """Patch the snapshot for the given hostnames (all when None) and sync hosts if it changed."""
+        if not self.snapshot.loaded:
+            self.apply_blocklist(session)
+            return
+
+        self.base_version += 1
+        if hostnames is None:
+            pending = set(self.snapshot) | self.profile_blocked.keys()
+            batches = [session.execute(self._active_rows_statement())]
+        else:
+            pending = set(hostnames)
+            batches = (
+                session.execute(self._active_rows_statement(chunk))
+                for chunk in _chunked(list(pending), _SQL_CHUNK_SIZE)
+            )
+
+        wanted: dict[str, str] = {}
+        for rows in batches:
+            for hostname, redirect_ip in rows:
+                if hostname in self.profile_allowed or hostname in self.profile_blocked:
+                    continue
+                pending.discard(hostname)
+                wanted[hostname] = redirect_ip
+        removals: list[str] = []
+        for hostname in pending:
+            if hostname in self.profile_blocked:
+                wanted[hostname] = self.profile_blocked[hostname]
+            else:
+                removals.append(hostname)
+
+        changed, removed = self.snapshot.apply_delta(wanted.items(), removals)
+        upserted = [
+            HostEntry(hostname=hostname, redirect_ip=redirect_ip)
+            for hostname, redirect_ip in changed
+        ]
+        self._publish(upserted, removed)
+
+    def _publish(self, upserted: list[HostEntry], removed: list[str]) -> None:
+        """Push a snapshot delta to hosts: add/remove via the helper, one rewrite otherwise."""
+        if not upserted and not removed:
+            return
+        if self.hosts_writer is None:
+            self._write_snapshot()
+            return
+        try:
+            if upserted:
+                self.hosts_writer.add(upserted)
+            if removed:
+                self.hosts_writer.remove(removed)
+        except SiteBlockerError:
+            self.snapshot.invalidate()
+            raise
+
+    def _write_snapshot(self) -> None:
+        entries = [
+            HostEntry(hostname=hostname, redirect_ip=redirect_ip)
+            for hostname, redirect_ip in self.snapshot.entries()
+        ]
+        try:
+            if self.hosts_writer is not None:
+                self.hosts_writer.apply(entries)
+            else:
+                self._rewrite_hosts_file(entries)
+        except SiteBlockerError:
+            # The surrounding transaction is about to roll back; force a reload.
+            self.snapshot.invalidate()
+            raise
 
     def _normalize_url(self, raw_url: str) -> str:
         candidate = raw_url.strip()
@@ -105,23 +770,44 @@ class SiteBlocker:
 
         if not hostname:
             raise SiteBlockerError(f"Could not determine hostname from '{raw_url}'.")
+        try:
+            hostname = hostname.encode("idna").decode("ascii")
+        except UnicodeError as exc:
+            raise SiteBlockerError(f"Invalid hostname '{raw_url}'.") from exc
+        if not is_valid_hostname(hostname):
+            raise SiteBlockerError(f"Invalid hostname '{raw_url}'.")
 
         return hostname
 
     def _rewrite_hosts_file(self, entries: Iterable[HostEntry]) -> None:
-        new_lines = [entry.render() for entry in entries]
-        existing_lines = self._read_hosts_lines()
-        filtered = [line for line in existing_lines if HOSTS_MARKER not in line]
-        final_lines = filtered + new_lines
-        text = "\n".join(final_lines)
-        if final_lines:
-            text += "\n"
-
+        new_lines = render_hosts_lines(
+            entries, self.hosts_layout, self.hostnames_per_line
+        )
         try:
-            self.hosts_path.parent.mkdir(parents=True, exist_ok=True)
-            self.hosts_path.write_text(text, encoding="utf-8")
+            self.hosts_lock.acquire()
+        except FileLockTimeout as exc:
+            raise SiteBlockerError(
+                f"Hosts file is locked by another SBAAS instance: {exc}"
+            ) from exc
         except OSError as exc:
-            raise SiteBlockerError(f"Failed to write hosts file: {exc}") from exc
+            raise SiteBlockerError(f"Failed to lock hosts file: {exc}") from exc
+
+        try:
+            existing_lines = self._read_hosts_lines()
+            # Managed lines are dropped whichever layout wrote them, so switching layouts is safe.
+            filtered = [line for line in existing_lines if not is_managed_line(line)]
+            final_lines = filtered + new_lines
+            text = "\n".join(final_lines)
+            if final_lines:
+                text += "\n"
+
+            try:
+                self.hosts_path.parent.mkdir(parents=True, exist_ok=True)
+                self.hosts_path.write_text(text, encoding="utf-8")
+            except OSError as exc:
+                raise SiteBlockerError(f"Failed to write hosts file: {exc}") from exc
+        finally:
+            self.hosts_lock.release()
 
     def _read_hosts_lines(self) -> list[str]:
         if not self.hosts_path.exists():
@@ -133,4 +819,59 @@ class SiteBlocker:
             raise SiteBlockerError(f"Failed to read hosts file: {exc}") from exc
 
 
-__all__ = ["BlockedSite", "HostEntry", "SiteBlocker", "SiteBlockerError"]
+def overlay_entries(
+    base: Mapping[str, str],
+    blocked: Mapping[str, str],
+    allowed: Iterable[str],
+) -> dict[str, str]:
+    """Compute a profile's effective set: ``(base - allowed) | blocked``."""
+    allowed = allowed if isinstance(allowed, (set, frozenset)) else set(allowed)
+    effective = {
+        hostname: ip for hostname, ip in base.items() if hostname not in allowed
+    }
+    effective.update(blocked)
+    return effective
+
+
+def is_valid_hostname(hostname: str) -> bool:
+    """True for a plain DNS label sequence that is safe to place on a hosts line."""
+    return len(hostname) <= 253 and _HOSTNAME_RE.fullmatch(hostname) is not None
+
+
+def is_valid_redirect_ip(redirect_ip: str) -> bool:
+    return _is_ip_address(redirect_ip)
+
+
+def _chunked(values: Iterable[str], size: int) -> Iterator[list[str]]:
+    iterator = iter(values)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _is_ip_address(token: str) -> bool:
+    try:
+        ipaddress.ip_address(token)
+    except ValueError:
+        return False
+    return True
+
+
+__all__ = [
+    "BlockedSite",
+    "BlocklistCategory",
+    "BlocklistSource",
+    "CategorySummary",
+    "HostEntry",
+    "SiteBlocker",
+    "SiteBlockerError",
+    "SourceSyncResult",
+    "blocked_site_categories",
+    "blocked_site_sources",
+    "hosts_fingerprint",
+    "is_managed_line",
+    "is_valid_hostname",
+    "is_valid_redirect_ip",
+    "overlay_entries",
+    "parse_managed_entries",
+    "render_hosts_lines",
+]
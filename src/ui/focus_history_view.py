@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QModelIndex,
+    QPersistentModelIndex,
+    QPointF,
+    Qt,
+)
+from PySide6.QtGui import QColor, QPainter, QPaintEvent, QPen, QPolygonF, QResizeEvent
+from PySide6.QtWidgets import (
+    QComboBox,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QTableView,
+    QVBoxLayout,
+    QWidget,
+)
+
+from src.config.db import get_session
+from src.features.focus_history import FocusHistoryService
+from src.utils.helpers import downsample_lttb
+
+_HEADERS = ("Completed", "Target (min)", "Focused (min)")
+
+_Row = tuple[str, int, float]
+_Cursor = tuple[datetime, int]
+
+# Label -> days of history to chart (None = everything).
+_RANGES: tuple[tuple[str, int | None], ...] = (
+    ("Last 30 days", 30),
+    ("Last 90 days", 90),
+    ("Last year", 365),
+    ("All time", None),
+)
+
+
+class FocusHistoryModel(QAbstractTableModel):
+    """Table model that lazily pulls keyset pages and keeps only a window of them in memory.
+
+    Each page's starting cursor is remembered (one small tuple per page), so a
+    page evicted from the window is re-read with a single keyset query when it
+    scrolls back into view. At most ``max_pages`` pages of rows are resident.
+    """
+
+    def __init__(
+        self,
+        service: FocusHistoryService,
+        page_size: int = 200,
+        max_pages: int = 8,
+        parent: QWidget | None = None,
+    ) -> None:
+        super().__init__(parent)
+        if max_pages < 2:
+            raise ValueError("max_pages must be at least 2.")
+        self.service = service
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._pages: dict[int, list[_Row]] = {}
+        self._page_cursors: list[_Cursor | None] = []
+        self._row_count = 0
+        self._cursor: _Cursor | None = None
+        self._exhausted = False
+
+    def reload(self) -> None:
+        self.beginResetModel()
+        self._pages = {}
+        self._page_cursors = []
+        self._row_count = 0
+        self._cursor = None
+        self._exhausted = False
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def rowCount(
+        self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()
+    ) -> int:
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(
+        self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()
+    ) -> int:
+        return 0 if parent.isValid() else len(_HEADERS)
+
+    def data(
+        self,
+        index: QModelIndex | QPersistentModelIndex,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> Any:
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        page_number, offset = divmod(index.row(), self.page_size)
+        rows = self._page(page_number)
+        if offset >= len(rows):
+            return None  # The page shrank since it was first read.
+        value = rows[offset][index.column()]
+        return f"{value:.1f}" if isinstance(value, float) else value
+
+    def headerData(
+        self,
+        section: int,
+        orientation: Qt.Orientation,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> Any:
+        if (
+            role == Qt.ItemDataRole.DisplayRole
+            and orientation == Qt.Orientation.Horizontal
+        ):
+            return _HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent: QModelIndex | QPersistentModelIndex) -> bool:
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent: QModelIndex | QPersistentModelIndex) -> None:
+        if parent.isValid() or self._exhausted:
+            return
+        page_number = len(self._page_cursors)
+        self._page_cursors.append(self._cursor)
+        rows, next_cursor = self._load(self._cursor)
+
+        if rows:
+            first = self._row_count
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._store(page_number, rows)
+            self._row_count += len(rows)
+            self.endInsertRows()
+        self._cursor = next_cursor
+        self._exhausted = next_cursor is None
+
+    def _page(self, page_number: int) -> list[_Row]:
+        rows = self._pages.get(page_number)
+        if rows is None:
+            rows, _ = self._load(self._page_cursors[page_number])
+            self._store(page_number, rows)
+        return rows
+
+    def _store(self, page_number: int, rows: list[_Row]) -> None:
+        self._pages[page_number] = rows
+        while len(self._pages) > self.max_pages:
+            # Evict the page farthest from the one just touched, i.e. from the viewport.
+            del self._pages[
+                max(self._pages, key=lambda cached: abs(cached - page_number))
+            ]
+
+    def _load(self, cursor: _Cursor | None) -> tuple[list[_Row], _Cursor | None]:
+        with get_session() as session:
+            page = self.service.page(session, cursor, limit=self.page_size)
+        rows = [
+            (
+                completed_at.strftime("%Y-%m-%d %H:%M"),
+                target_minutes,
+                actual_seconds / 60,
+            )
+            for _id, target_minutes, actual_seconds, _started_at, completed_at in page.rows
+        ]
+        return rows, page.cursor
+
+
+class FocusTrendChart(QWidget):
+    """Line chart of focused minutes per day, downsampled to one point per pixel."""
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setMinimumHeight(160)
+        self._series: list[tuple[float, float]] = []
+        self._visible: list[tuple[float, float]] = []
+
+    def set_series(self, series: list[tuple[date, int]]) -> None:
+        self._series = [
+            (float(day.toordinal()), seconds / 60) for day, seconds in series
+        ]
+        self._resample()
+        self.update()
+
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        super().resizeEvent(event)
+        self._resample()
+
+    def _resample(self) -> None:
+        self._visible = downsample_lttb(self._series, max(self.width() - 16, 2))
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = self.rect().adjusted(8, 8, -8, -8)
+        painter.setPen(QPen(QColor("#c4c4c4"), 1))
+        painter.drawRect(rect)
+
+        if len(self._visible) < 2:
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, "No focus history yet")
+            return
+
+        min_x, max_x = self._visible[0][0], self._visible[-1][0]
+        max_y = max(y for _, y in self._visible) or 1.0
+        span_x = (max_x - min_x) or 1.0
+        polygon = QPolygonF(
+            [
+                QPointF(
+                    rect.left() + (x - min_x) / span_x * rect.width(),
+                    rect.bottom() - y / max_y * rect.height(),
+                )
+                for x, y in self._visible
+            ]
+        )
+        painter.setPen(QPen(QColor("#1b5e20"), 2))
+        painter.drawPolyline(polygon)
+        painter.drawText(rect.adjusted(4, 2, 0, 0), f"max {max_y:.0f} min/day")
+
+
+class FocusHistoryView(QWidget):
+    """Focus history tab: trend chart over a selectable range plus a paged session table."""
+
+    def __init__(
+        self, service: FocusHistoryService, parent: QWidget | None = None
+    ) -> None:
+        super().__init__(parent)
+        self.service = service
+
+        layout = QVBoxLayout(self)
+        layout.setSpacing(12)
+        layout.setContentsMargins(16, 16, 16, 16)
+
+        range_layout = QHBoxLayout()
+        range_layout.addWidget(QLabel("Trend range", self))
+        self.range_combo = QComboBox(self)
+        for label, days in _RANGES:
+            self.range_combo.addItem(label, days)
+        self.range_combo.currentIndexChanged.connect(self.refresh_chart)
+        range_layout.addWidget(self.range_combo)
+        range_layout.addStretch(1)
+        layout.addLayout(range_layout)
+
+        self.chart = FocusTrendChart(self)
+        layout.addWidget(self.chart)
+
+        self.model = FocusHistoryModel(service, parent=self)
+        self.table = QTableView(self)
+        self.table.setModel(self.model)
+        self.table.setObjectName("focusHistoryTable")
+        self.table.setAlternatingRowColors(True)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setColumnWidth(0, 160)
+        # Fixed row heights keep scrolling O(visible rows) however much history is loaded.
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table, stretch=1)
+
+    def refresh(self) -> None:
+        self.model.reload()
+        self.refresh_chart()
+
+    def refresh_chart(self) -> None:
+        days = self.range_combo.currentData()
+        start = (
+            None
+            if days is None
+            else (datetime.now(timezone.utc) - timedelta(days=days)).date()
+        )
+        with get_session() as session:
+            series = self.service.daily_seconds(session, start=start)
+        self.chart.set_series(series)
+
+
+__all__ = ["FocusHistoryModel", "FocusHistoryView", "FocusTrendChart"]
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import logging
+from collections import Counter
 from datetime import datetime, timezone
 
-from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QIntValidator
+from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtGui import QAction, QIntValidator
 from PySide6.QtWidgets import (
+    QCheckBox,
+    QComboBox,
     QHBoxLayout,
+    QInputDialog,
     QLabel,
     QLineEdit,
     QListWidget,
@@ -19,31 +24,55 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QWidget,
 )
-from sqlalchemy import select
-
 from src.config.config_loader import Config
 from src.config.db import get_session
+from src.features.block_page import top_hits
+from src.features.blocklist_profiles import ProfileService
+from src.features.focus_archive import FocusArchiveService
+from src.features.focus_history import FocusHistoryService
 from src.features.focus_timer import FocusTimerService
-from src.features.site_blocker import BlockedSite, SiteBlocker, SiteBlockerError
+from src.features.site_blocker import SiteBlocker, SiteBlockerError
+from src.ui.focus_history_view import FocusHistoryView
+from src.ui.single_instance import LaunchRequest
+from src.utils.sampling_profiler import SamplingProfiler, write_collapsed
+
+_LOGGER = logging.getLogger(__name__)
 
 
 class MainWindow(QMainWindow):
     """Primary application window."""
 
+    profile_finished = Signal(str, bool)
+
     def __init__(
         self,
         config: Config,
         site_blocker: SiteBlocker,
         warning_message: str | None = None,
+        profile_service: ProfileService | None = None,
     ) -> None:
         super().__init__()
         self.config = config
         self.site_blocker = site_blocker
+        self.profile_service = profile_service or ProfileService(site_blocker)
+        self.profile_combo: QComboBox | None = None
         self.warning_message = warning_message
+        self.tab_widget: QTabWidget | None = None
         self.domain_input: QLineEdit | None = None
+        self.category_input: QLineEdit | None = None
+        self.category_layout: QHBoxLayout | None = None
+        self.category_checkboxes: dict[str, QCheckBox] = {}
         self.block_list_widget: QListWidget | None = None
         self.status_label: QLabel | None = None
+        self._rendered_block_version: int | None = None
         self.focus_service = FocusTimerService()
+        self.focus_history_service = FocusHistoryService(
+            FocusArchiveService(self.config.archive_database_path)
+        )
+        self.focus_history_view: FocusHistoryView | None = None
+        self.profiler = SamplingProfiler()
+        self.profile_action: QAction | None = None
+        self.profile_finished.connect(self._handle_profile_finished)
         self.focus_minutes_input: QLineEdit | None = None
         self.focus_elapsed_label: QLabel | None = None
         self.focus_message_label: QLabel | None = None
@@ -58,8 +87,31 @@ class MainWindow(QMainWindow):
         self.focus_running = False
         self.focus_started_at: datetime | None = None
 
+        self.subscription_timer = QTimer(self)
+        self.subscription_timer.setInterval(
+            max(self.config.subscription_sync_minutes, 1) * 60_000
+        )
+        self.subscription_timer.timeout.connect(self.sync_subscriptions)
+
+        self.block_hits_label: QLabel | None = None
+        self.block_hits_timer = QTimer(self)
+        self.block_hits_timer.setInterval(
+            int(self.config.block_page_flush_seconds * 1000)
+        )
+        self.block_hits_timer.timeout.connect(self.refresh_block_hits)
+
         self._build_ui()
+        self.refresh_profiles()
         self.refresh_block_list()
+        self.refresh_categories()
+        self._refresh_focus_history()
+        if self.config.block_page_enabled:
+            self.refresh_block_hits()
+            self.block_hits_timer.start()
+        # Always reconcile once so sources removed from settings are dropped.
+        QTimer.singleShot(0, self.sync_subscriptions)
+        if self.config.blocklist_subscriptions:
+            self.subscription_timer.start()
 
     def _build_ui(self) -> None:
         self.setWindowTitle(f"{self.config.app_name} v{self.config.app_version}")
@@ -74,7 +126,10 @@ class MainWindow(QMainWindow):
         tab_widget.setObjectName("mainTabs")
         tab_widget.addTab(self._build_site_blocking_tab(), "Site Blocking")
         tab_widget.addTab(self._build_focus_timer_tab(), "Focus Timer")
+        self.focus_history_view = FocusHistoryView(self.focus_history_service, self)
+        tab_widget.addTab(self.focus_history_view, "Focus History")
         root_layout.addWidget(tab_widget)
+        self.tab_widget = tab_widget
 
         self.setCentralWidget(central_widget)
 
@@ -82,6 +137,14 @@ class MainWindow(QMainWindow):
         toolbar.setMovable(False)
         self.addToolBar(Qt.ToolBarArea.TopToolBarArea, toolbar)
 
+        self.profile_action = QAction("Profile", self)
+        self.profile_action.setCheckable(True)
+        self.profile_action.setToolTip(
+            "Sample the app for a few seconds and save a flame-graph profile"
+        )
+        self.profile_action.toggled.connect(self.handle_toggle_profiler)
+        toolbar.addAction(self.profile_action)
+
         status_bar = QStatusBar(self)
         status_bar.showMessage(f"Theme: {self.config.ui_theme}")
         self.setStatusBar(status_bar)
@@ -100,13 +163,35 @@ class MainWindow(QMainWindow):
             warning_label.setStyleSheet("color: #b3261e; font-weight: bold;")
             layout.addWidget(warning_label)
 
+        profile_layout = QHBoxLayout()
+        profile_layout.setSpacing(8)
+        profile_layout.addWidget(QLabel("Profile", self))
+        self.profile_combo = QComboBox(self)
+        self.profile_combo.setObjectName("profileCombo")
+        self.profile_combo.setToolTip(
+            "Your additions and exceptions on top of the shared blocklist"
+        )
+        self.profile_combo.activated.connect(self.handle_switch_profile)
+        profile_layout.addWidget(self.profile_combo)
+        new_profile_button = QPushButton("New Profile", self)
+        new_profile_button.clicked.connect(self.handle_new_profile)
+        profile_layout.addWidget(new_profile_button)
+        profile_layout.addStretch(1)
+        layout.addLayout(profile_layout)
+
         controls_layout = QHBoxLayout()
         controls_layout.setSpacing(8)
 
         self.domain_input = QLineEdit(self)
-        self.domain_input.setPlaceholderText("Enter domain to block (e.g., example.com)")
+        self.domain_input.setPlaceholderText(
+            "Enter domain to block (e.g., example.com)"
+        )
         controls_layout.addWidget(self.domain_input, stretch=2)
 
+        self.category_input = QLineEdit(self)
+        self.category_input.setPlaceholderText("Category (optional)")
+        controls_layout.addWidget(self.category_input, stretch=1)
+
         add_button = QPushButton("Add", self)
         add_button.clicked.connect(self.handle_add_domain)
         controls_layout.addWidget(add_button)
@@ -117,11 +202,23 @@ class MainWindow(QMainWindow):
 
         layout.addLayout(controls_layout)
 
+        self.category_layout = QHBoxLayout()
+        self.category_layout.setSpacing(8)
+        layout.addLayout(self.category_layout)
+
         self.block_list_widget = QListWidget(self)
-        self.block_list_widget.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        self.block_list_widget.setSelectionMode(
+            QListWidget.SelectionMode.ExtendedSelection
+        )
         self.block_list_widget.setObjectName("blockedSitesList")
         layout.addWidget(self.block_list_widget, stretch=1)
 
+        self.block_hits_label = QLabel("", self)
+        self.block_hits_label.setWordWrap(True)
+        self.block_hits_label.setObjectName("blockHitsLabel")
+        self.block_hits_label.setVisible(self.config.block_page_enabled)
+        layout.addWidget(self.block_hits_label)
+
         self.status_label = QLabel("", self)
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.status_label.setObjectName("statusLabel")
@@ -178,31 +275,170 @@ class MainWindow(QMainWindow):
         if self.block_list_widget is None:
             return
 
-        self.block_list_widget.clear()
-        try:
-            with get_session() as session:
-                stmt = (
-                    select(BlockedSite)
-                    .where(BlockedSite.is_active.is_(True))
-                    .order_by(BlockedSite.url)
-                )
-                sites = [
-                    (site.url, site.redirect_ip)
-                    for site in session.scalars(stmt).all()
-                ]
-        except Exception as exc:  # pragma: no cover - fallback UI path
-            self._set_status(f"Failed to load blocked sites: {exc}", error=True)
+        snapshot = self.site_blocker.snapshot
+        if not snapshot.loaded:
+            try:
+                with get_session() as session:
+                    self.site_blocker.load_snapshot(session)
+            except Exception as exc:  # pragma: no cover - fallback UI path
+                self._set_status(f"Failed to load blocked sites: {exc}", error=True)
+                return
+
+        if snapshot.version == self._rendered_block_version:
             return
+        self._rendered_block_version = snapshot.version
 
-        for url, redirect_ip in sites:
+        self.block_list_widget.setUpdatesEnabled(False)
+        self.block_list_widget.clear()
+        for url, redirect_ip in snapshot.entries():
             label = f"{url} -> {redirect_ip}"
             item = QListWidgetItem(label)
             item.setData(Qt.ItemDataRole.UserRole, url)
             self.block_list_widget.addItem(item)
+        self.block_list_widget.setUpdatesEnabled(True)
 
-        if not sites:
+        if not snapshot:
             self._set_status("No blocked sites configured.", error=False)
 
+    def refresh_categories(self) -> None:
+        if self.category_layout is None:
+            return
+        try:
+            with get_session() as session:
+                categories = self.site_blocker.list_categories(session)
+        except Exception as exc:  # pragma: no cover - fallback UI path
+            self._set_status(f"Failed to load categories: {exc}", error=True)
+            return
+
+        for checkbox in self.category_checkboxes.values():
+            self.category_layout.removeWidget(checkbox)
+            checkbox.deleteLater()
+        self.category_checkboxes = {}
+
+        for category in categories:
+            checkbox = QCheckBox(f"{category.name} ({category.site_count})", self)
+            checkbox.setChecked(category.is_active)
+            checkbox.toggled.connect(
+                lambda checked, name=category.name: self.handle_toggle_category(
+                    name, checked
+                )
+            )
+            self.category_layout.addWidget(checkbox)
+            self.category_checkboxes[category.name] = checkbox
+
+    def handle_toggle_category(self, name: str, active: bool) -> None:
+        try:
+            with get_session() as session:
+                self.site_blocker.set_category_active(session, name, active)
+        except SiteBlockerError as exc:
+            self._set_status(str(exc), error=True)
+            checkbox = self.category_checkboxes.get(name)
+            if checkbox is not None:
+                checkbox.blockSignals(True)
+                checkbox.setChecked(not active)
+                checkbox.blockSignals(False)
+            return
+
+        state = "enabled" if active else "disabled"
+        self._set_status(f"Category {name} {state}", error=False)
+        self.refresh_block_list()
+
+    def refresh_block_hits(self) -> None:
+        if self.block_hits_label is None:
+            return
+        try:
+            with get_session() as session:
+                hits = top_hits(session, limit=5)
+        except Exception as exc:  # pragma: no cover - fallback UI path
+            self.block_hits_label.setText(f"Failed to load block page hits: {exc}")
+            return
+
+        if not hits:
+            self.block_hits_label.setText("Most blocked: no hits recorded yet.")
+            return
+        summary = ", ".join(f"{hostname} ({count})" for hostname, count in hits)
+        self.block_hits_label.setText(f"Most blocked: {summary}")
+
+    def sync_subscriptions(self) -> None:
+        """Match sources to the configured blocklist files and apply their changes."""
+        try:
+            with get_session() as session:
+                dropped = self.site_blocker.reconcile_sources(
+                    session, self.config.blocklist_subscriptions
+                )
+                results = self.site_blocker.sync_sources(session)
+        except SiteBlockerError as exc:
+            self._set_status(str(exc), error=True)
+            return
+
+        errors = [result.error for result in results if result.error]
+        for error in errors:
+            _LOGGER.warning(error)
+        added = sum(result.added for result in results)
+        removed = sum(result.removed for result in results)
+        if errors:
+            self._set_status(errors[0], error=True)
+        elif added or removed or dropped:
+            self._set_status(
+                f"Subscriptions synced: +{added} / -{removed} domains", error=False
+            )
+        self.refresh_block_list()
+
+    def refresh_profiles(self) -> None:
+        if not self.profile_combo:
+            return
+        with get_session() as session:
+            names = self.profile_service.list_profiles(session)
+        self.profile_combo.clear()
+        self.profile_combo.addItem("Shared list", None)
+        for name in names:
+            self.profile_combo.addItem(name, name)
+        index = self.profile_combo.findData(self.profile_service.current_name)
+        self.profile_combo.setCurrentIndex(max(index, 0))
+
+    def handle_switch_profile(self, index: int) -> None:
+        if not self.profile_combo:
+            return
+        name = self.profile_combo.itemData(index)
+        if name == self.profile_service.current_name:
+            return
+        try:
+            with get_session() as session:
+                added, removed = self.profile_service.switch_profile(session, name)
+        except (SiteBlockerError, ValueError) as exc:
+            self._set_status(str(exc), error=True)
+            self._reload_profile_state()
+            return
+
+        self._set_status(
+            f"Switched to {name or 'shared list'}: +{added} / -{removed} domains",
+            error=False,
+        )
+        self.refresh_block_list()
+
+    def _reload_profile_state(self) -> None:
+        """Re-sync profile overrides with the database after a rolled-back profile change."""
+        with get_session() as session:
+            self.profile_service.reload(session)
+        self.refresh_profiles()
+        self.refresh_block_list()
+
+    def handle_new_profile(self) -> None:
+        name, accepted = QInputDialog.getText(self, "New Profile", "Profile name")
+        if not accepted or not name.strip():
+            return
+        try:
+            with get_session() as session:
+                self.profile_service.add_profile(session, name)
+        except ValueError as exc:
+            self._set_status(str(exc), error=True)
+            return
+        self.refresh_profiles()
+        if self.profile_combo:
+            index = self.profile_combo.findData(name.strip())
+            self.profile_combo.setCurrentIndex(index)
+            self.handle_switch_profile(index)
+
     def handle_add_domain(self) -> None:
         if not self.domain_input:
             return
@@ -211,18 +447,60 @@ class MainWindow(QMainWindow):
             self._set_status("Enter a domain before adding.", error=True)
             return
 
+        category = self.category_input.text().strip() if self.category_input else ""
+        if self._block_domain(domain, category or None):
+            self.domain_input.clear()
+
+    def handle_launch_request(self, request: LaunchRequest) -> None:
+        """Act on arguments forwarded from a later launch of the application."""
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+        for domain in request.block_domains:
+            if self.tab_widget is not None:
+                self.tab_widget.setCurrentIndex(0)
+            self._block_domain(domain)
+
+        if request.focus_minutes is not None and self.focus_minutes_input is not None:
+            if self.tab_widget is not None:
+                self.tab_widget.setCurrentIndex(1)
+            if not self.focus_running:
+                self.focus_minutes_input.setText(str(request.focus_minutes))
+                self.handle_start_focus()
+
+    def _block_domain(self, domain: str, category: str | None = None) -> bool:
+        profile = self.profile_service.current_name
+        if profile is not None and not category:
+            # Uncategorized additions while a profile is active stay personal.
+            try:
+                with get_session() as session:
+                    self.profile_service.block_site(session, profile, domain)
+            except (SiteBlockerError, ValueError) as exc:
+                self._set_status(str(exc), error=True)
+                self._reload_profile_state()
+                return False
+            self._set_status(f"Blocked {domain} for {profile}", error=False)
+            self.refresh_block_list()
+            return True
+
         try:
             blocked_url: str | None = None
             with get_session() as session:
                 site = self.site_blocker.add_site(session, domain)
                 blocked_url = site.url
+                if category:
+                    self.site_blocker.assign_category(session, category, [blocked_url])
         except SiteBlockerError as exc:
             self._set_status(str(exc), error=True)
-            return
+            return False
 
-        self.domain_input.clear()
         self._set_status(f"Blocked {blocked_url}", error=False)
         self.refresh_block_list()
+        if category:
+            self.refresh_categories()
+        return True
 
     def handle_remove_selected(self) -> None:
         if not self.block_list_widget:
@@ -233,15 +511,30 @@ class MainWindow(QMainWindow):
             self._set_status("Select at least one domain to remove.", error=True)
             return
 
-        domains = [item.data(Qt.ItemDataRole.UserRole) for item in items if item.data(Qt.ItemDataRole.UserRole)]
+        domains = [
+            item.data(Qt.ItemDataRole.UserRole)
+            for item in items
+            if item.data(Qt.ItemDataRole.UserRole)
+        ]
+        profile = self.profile_service.current_name
         removed: list[str] = []
         try:
             with get_session() as session:
                 for domain in domains:
-                    if domain and self.site_blocker.remove_site(session, domain):
+                    if profile is not None:
+                        # Personal blocks are dropped; shared entries become exceptions for this profile.
+                        cleared = self.profile_service.clear_override(
+                            session, profile, domain
+                        )
+                        if not cleared or domain in self.site_blocker.snapshot:
+                            self.profile_service.allow_site(session, profile, domain)
                         removed.append(domain)
-        except SiteBlockerError as exc:
+                    elif self.site_blocker.remove_site(session, domain):
+                        removed.append(domain)
+        except (SiteBlockerError, ValueError) as exc:
             self._set_status(str(exc), error=True)
+            if profile is not None:
+                self._reload_profile_state()
             return
 
         if removed:
@@ -250,6 +543,45 @@ class MainWindow(QMainWindow):
             self._set_status("No domains were removed.", error=True)
         self.refresh_block_list()
 
+    def handle_toggle_profiler(self, enabled: bool) -> None:
+        if enabled:
+            self.start_profiler(self.config.profile_seconds)
+        elif self.profiler.running:
+            self.profiler.stop()
+
+    def start_profiler(self, seconds: float) -> None:
+        """Run the sampling profiler for ``seconds`` and write collapsed stacks when done."""
+        if self.profiler.running:
+            return
+        path = (
+            self.config.profile_dir / f"sbaas-{datetime.now():%Y%m%d-%H%M%S}.collapsed"
+        )
+
+        def finish(samples: Counter[str]) -> None:
+            # Runs on the profiler thread; the signal hops back to the GUI thread.
+            try:
+                self.profile_finished.emit(
+                    f"Profile saved to {write_collapsed(samples, path)}", False
+                )
+            except OSError as exc:
+                self.profile_finished.emit(f"Failed to save profile: {exc}", True)
+
+        self.profiler.start(seconds, on_finish=finish)
+        if self.profile_action is not None:
+            self.profile_action.blockSignals(True)
+            self.profile_action.setChecked(True)
+            self.profile_action.blockSignals(False)
+        self.statusBar().showMessage(f"Profiling for {seconds:g}s...")
+
+    def _handle_profile_finished(self, message: str, error: bool) -> None:
+        if self.profile_action is not None:
+            self.profile_action.blockSignals(True)
+            self.profile_action.setChecked(False)
+            self.profile_action.blockSignals(False)
+        self.statusBar().showMessage(message)
+        if error:
+            _LOGGER.error(message)
+
     def _set_status(self, message: str, error: bool) -> None:
         if not self.status_label:
             return
@@ -258,7 +590,11 @@ class MainWindow(QMainWindow):
         self.status_label.setText(message)
 
     def handle_start_focus(self) -> None:
-        if self.focus_minutes_input is None or self.focus_start_button is None or self.focus_stop_button is None:
+        if (
+            self.focus_minutes_input is None
+            or self.focus_start_button is None
+            or self.focus_stop_button is None
+        ):
             return
         if self.focus_running:
             return
@@ -275,7 +611,9 @@ class MainWindow(QMainWindow):
             return
 
         if minutes <= 0:
-            self._set_focus_status("Focus duration must be greater than zero.", error=True)
+            self._set_focus_status(
+                "Focus duration must be greater than zero.", error=True
+            )
             return
 
         self.focus_target_minutes = minutes
@@ -338,16 +676,27 @@ class MainWindow(QMainWindow):
                     completed_at=completed_at,
                 )
         except Exception as exc:  # pragma: no cover - UI feedback only
-            self._set_focus_status(f"Focus completed but failed to save: {exc}", error=True)
+            self._set_focus_status(
+                f"Focus completed but failed to save: {exc}", error=True
+            )
             return
 
         self._set_focus_status("Focus session completed!", error=False)
+        self._refresh_focus_history()
         QMessageBox.information(
             self,
             "Focus Complete",
             "Great job! You completed your focus session.",
         )
 
+    def _refresh_focus_history(self) -> None:
+        if self.focus_history_view is None:
+            return
+        try:
+            self.focus_history_view.refresh()
+        except Exception as exc:  # pragma: no cover - UI feedback only
+            self._set_focus_status(f"Failed to load focus history: {exc}", error=True)
+
     def _update_focus_elapsed_label(self) -> None:
         if not self.focus_elapsed_label:
             return
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import getpass
+import json
+import re
+from dataclasses import dataclass
+
+from PySide6.QtCore import QDir, QLockFile, QObject, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+
+@dataclass(slots=True, frozen=True)
+class LaunchRequest:
+    """Arguments a launch wants the running instance to act on."""
+
+    block_domains: tuple[str, ...] = ()
+    focus_minutes: int | None = None
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.block_domains and self.focus_minutes is None
+
+
+def encode_launch_request(request: LaunchRequest) -> bytes:
+    payload = {"block": list(request.block_domains), "focus": request.focus_minutes}
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def decode_launch_request(raw: bytes) -> LaunchRequest:
+    """Parse a forwarded request, ignoring malformed fields."""
+    try:
+        payload = json.loads(raw.decode("utf-8").strip() or "{}")
+    except (UnicodeDecodeError, ValueError):
+        return LaunchRequest()
+    if not isinstance(payload, dict):
+        return LaunchRequest()
+
+    domains = payload.get("block") or []
+    focus = payload.get("focus")
+    return LaunchRequest(
+        block_domains=tuple(
+            str(domain)
+            for domain in domains
+            if isinstance(domain, str) and domain.strip()
+        ),
+        focus_minutes=focus if isinstance(focus, int) and focus > 0 else None,
+    )
+
+
+def instance_key(app_name: str = "SBAAS Productivity") -> str:
+    """Return a per-user local server name for the given application."""
+    raw = f"{app_name}-{getpass.getuser()}"
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", raw).lower()
+
+
+class SingleInstanceGuard(QObject):
+    """Ensures only one GUI runs per user and relays later launches to it."""
+
+    request_received = Signal(object)
+
+    def __init__(self, key: str, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.key = key
+        self._server: QLocalServer | None = None
+        self._buffers: dict[QLocalSocket, bytearray] = {}
+
+    def forward(self, request: LaunchRequest, timeout_ms: int = 300) -> bool:
+        """Send the request to a running instance. Returns False if none is listening."""
+        socket = QLocalSocket()
+        socket.connectToServer(self.key)
+        if not socket.waitForConnected(timeout_ms):
+            return False
+
+        socket.write(encode_launch_request(request))
+        socket.waitForBytesWritten(timeout_ms)
+        socket.disconnectFromServer()
+        if socket.state() != QLocalSocket.LocalSocketState.UnconnectedState:
+            socket.waitForDisconnected(timeout_ms)
+        return True
+
+    def listen(self, timeout_ms: int = 2000) -> bool:
+        """Start accepting hand-offs from later launches.
+
+        Returns False when another instance owns the name; callers should
+        ``forward`` to it instead of running a second GUI.
+        """
+        # Serializes the probe/cleanup/listen sequence between concurrent launches.
+        lock = QLockFile(QDir.temp().filePath(f"{self.key}.lock"))
+        if not lock.tryLock(timeout_ms):
+            return False
+        try:
+            # Probe first: with access options set, Qt replaces an existing socket instead of failing.
+            if self._server_alive():
+                return False
+            # Nothing answered, so a leftover socket is stale (a crashed instance on Unix).
+            QLocalServer.removeServer(self.key)
+            server = QLocalServer(self)
+            server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+            if not server.listen(self.key):
+                return False
+        finally:
+            lock.unlock()
+
+        server.newConnection.connect(self._accept_connections)
+        self._server = server
+        return True
+
+    def close(self) -> None:
+        """Stop listening; pending hand-off sockets are dropped without emitting requests."""
+        for socket in list(self._buffers):
+            socket.readyRead.disconnect()
+            socket.disconnected.disconnect()
+            socket.abort()
+            socket.deleteLater()
+        self._buffers.clear()
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    def _server_alive(self, timeout_ms: int = 300) -> bool:
+        socket = QLocalSocket()
+        socket.connectToServer(self.key)
+        if not socket.waitForConnected(timeout_ms):
+            return False
+        socket.abort()
+        return True
+
+    def _accept_connections(self) -> None:
+        if self._server is None:
+            return
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            self._buffers[socket] = bytearray()
+            socket.readyRead.connect(lambda s=socket: self._read_socket(s))
+            socket.disconnected.connect(lambda s=socket: self._finish_socket(s))
+
+    def _read_socket(self, socket: QLocalSocket) -> None:
+        buffer = self._buffers.get(socket)
+        if buffer is None:
+            return
+        buffer.extend(bytes(socket.readAll().data()))
+        while b"\n" in buffer:
+            line, _, rest = bytes(buffer).partition(b"\n")
+            buffer[:] = rest
+            self.request_received.emit(decode_launch_request(line))
+
+    def _finish_socket(self, socket: QLocalSocket) -> None:
+        self._read_socket(socket)
+        buffer = self._buffers.pop(socket, None)
+        if buffer and buffer.strip():
+            self.request_received.emit(decode_launch_request(bytes(buffer)))
+        socket.deleteLater()
+
+
+__all__ = [
+    "LaunchRequest",
+    "SingleInstanceGuard",
+    "decode_launch_request",
+    "encode_launch_request",
+    "instance_key",
+]
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from PySide6.QtCore import QObject, QTimer
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class EventLoopWatchdog(QObject):
+    """Detects Qt event-loop stalls and logs the GUI thread's stack while it is blocked.
+
+    A heartbeat timer on the GUI thread records when it last ran; a background
+    thread compares that with the clock and, once the delay passes
+    ``threshold_ms``, captures the GUI thread's current Python stack.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: int = 250,
+        heartbeat_ms: int = 50,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.heartbeat = heartbeat_ms / 1000
+        self.max_latency = 0.0
+        self.stalls = 0
+        self._gui_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._reported_beat: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(heartbeat_ms)
+        self._timer.timeout.connect(self._beat)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._gui_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._timer.start()
+        self._thread = threading.Thread(
+            target=self._watch, name="event-loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._timer.stop()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _beat(self) -> None:
+        now = time.monotonic()
+        latency = now - self._last_beat - self.heartbeat
+        if latency > self.max_latency:
+            self.max_latency = latency
+        self._last_beat = now
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.heartbeat / 2):
+            beat = self._last_beat
+            stalled_for = time.monotonic() - beat - self.heartbeat
+            if stalled_for < self.threshold or self._reported_beat == beat:
+                continue
+            self._reported_beat = beat
+            self.stalls += 1
+            frame = sys._current_frames().get(self._gui_thread_id)
+            stack = (
+                "".join(traceback.format_stack(frame))
+                if frame is not None
+                else "<unavailable>\n"
+            )
+            _LOGGER.warning(
+                "GUI event loop stalled for %.0f ms; GUI thread stack:\n%s",
+                stalled_for * 1000,
+                stack,
+            )
+
+
+__all__ = ["EventLoopWatchdog"]
@@ -29,4 +29,53 @@ def ensure_sequence(values: Iterable[float]) -> Sequence[float]:
     return tuple(values)
 
 
-__all__ = ["safe_divide", "rolling_average", "clamp", "ensure_sequence"]
+def downsample_lttb(
+    points: Sequence[tuple[float, float]], budget: int
+) -> list[tuple[float, float]]:
+    """Reduce a series to ``budget`` points with Largest-Triangle-Three-Buckets.
+
+    Points must be sorted by x. The first and last points are always kept, and
+    each bucket in between contributes the point that spans the largest
+    triangle with its neighbours, which preserves peaks and troughs.
+    """
+    count = len(points)
+    if budget >= count:
+        return list(points)
+    if budget <= 2:
+        return [points[0], points[-1]][: max(budget, 0)]
+
+    sampled = [points[0]]
+    bucket_size = (count - 2) / (budget - 2)
+    anchor = points[0]
+    for bucket in range(budget - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        next_points = points[end:next_end] or points[-1:]
+        avg_x = sum(x for x, _ in next_points) / len(next_points)
+        avg_y = sum(y for _, y in next_points) / len(next_points)
+
+        best = points[start]
+        best_area = -1.0
+        for candidate in points[start:end]:
+            area = abs(
+                (anchor[0] - avg_x) * (candidate[1] - anchor[1])
+                - (anchor[0] - candidate[0]) * (avg_y - anchor[1])
+            )
+            if area > best_area:
+                best_area = area
+                best = candidate
+        sampled.append(best)
+        anchor = best
+
+    sampled.append(points[-1])
+    return sampled
+
+
+__all__ = [
+    "safe_divide",
+    "rolling_average",
+    "clamp",
+    "ensure_sequence",
+    "downsample_lttb",
+]
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Callable
+
+
+def collapse_stack(frame: FrameType | None, prefix: str = "") -> str:
+    """Render a frame chain root-first as a ``;``-joined collapsed-stack key."""
+    parts: list[str] = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{Path(code.co_filename).name}:{code.co_name}")
+        frame = frame.f_back
+    if prefix:
+        parts.append(prefix)
+    parts.reverse()
+    return ";".join(parts)
+
+
+def write_collapsed(samples: Counter[str], path: str | Path) -> Path:
+    """Write samples in the collapsed-stack format consumed by flamegraph tools."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    lines = [f"{stack} {count}" for stack, count in samples.most_common()]
+    target.write_text("\n".join(lines) + ("\n" if lines else ""), encoding="utf-8")
+    return target
+
+
+class SamplingProfiler:
+    """Low-overhead wall-clock profiler that periodically samples every thread's stack."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(
+        self,
+        duration: float | None = None,
+        on_finish: Callable[[Counter[str]], None] | None = None,
+    ) -> None:
+        """Begin sampling; stops by itself after ``duration`` seconds when given."""
+        if self.running:
+            return
+        self.samples = Counter()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(duration, on_finish),
+            name="sampling-profiler",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        return self.samples
+
+    def _run(
+        self, duration: float | None, on_finish: Callable[[Counter[str]], None] | None
+    ) -> None:
+        own_id = threading.get_ident()
+        deadline = None if duration is None else time.monotonic() + duration
+        while not self._stop.is_set():
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.samples[
+                        collapse_stack(frame, names.get(thread_id, str(thread_id)))
+                    ] += 1
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            self._stop.wait(self.interval)
+        if on_finish is not None:
+            on_finish(self.samples)
+
+
+__all__ = ["SamplingProfiler", "collapse_stack", "write_collapsed"]
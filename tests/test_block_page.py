@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import socket
+from typing import Mapping
+
+from src.features.block_page import (
+    BlockPageServer,
+    _extract_host,
+    record_hits,
+    top_hits,
+)
+
+
+def _request(port: int, host: str) -> bytes:
+    with socket.create_connection(("127.0.0.1", port), timeout=2) as conn:
+        conn.sendall(
+            f"GET / HTTP/1.1\r\nHost: {host}\r\nAccept: */*\r\n\r\n".encode("ascii")
+        )
+        chunks = []
+        while chunk := conn.recv(4096):
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def test_extract_host_strips_port_and_case() -> None:
+    assert (
+        _extract_host(b"GET / HTTP/1.1\r\nHOST: Ads.Example.com:8080")
+        == "ads.example.com"
+    )
+    assert _extract_host(b"GET / HTTP/1.0") is None
+
+
+def test_server_serves_page_and_flushes_counts_on_stop() -> None:
+    flushed: list[dict[str, int]] = []
+
+    def collect(hits: Mapping[str, int]) -> None:
+        flushed.append(dict(hits))
+
+    server = BlockPageServer(
+        port=0,
+        flush_interval=60,
+        hostname_filter=lambda hostname: hostname.endswith(".test"),
+        on_flush=collect,
+    )
+    server.start()
+    try:
+        response = _request(server.port, "tracker.test")
+        _request(server.port, "tracker.test")
+        _request(server.port, "not-blocked.example")
+    finally:
+        server.stop()
+
+    assert response.startswith(b"HTTP/1.1 200 OK")
+    assert b"blocked by SBAAS" in response
+    assert flushed == [{"tracker.test": 2}]
+
+
+def test_record_hits_accumulates_batches(db_session) -> None:
+    record_hits(db_session, {"hits-a.test": 3, "hits-b.test": 1})
+    record_hits(db_session, {"hits-b.test": 5})
+
+    counts = dict(top_hits(db_session, limit=50))
+    assert counts["hits-a.test"] == 3
+    assert counts["hits-b.test"] == 6
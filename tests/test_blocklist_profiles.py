@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from src.features.blocklist_profiles import ProfileService
+from src.features.site_blocker import (
+    SiteBlocker,
+    SiteBlockerError,
+    parse_managed_entries,
+)
+
+
+def _blocked_hosts(hosts_path: Path) -> set[str]:
+    lines = hosts_path.read_text(encoding="utf-8").splitlines()
+    return {entry.hostname for entry in parse_managed_entries(lines)}
+
+
+@pytest.fixture()
+def profiles(db_session, tmp_path) -> ProfileService:
+    hosts_path = tmp_path / "hosts"
+    hosts_path.write_text("127.0.0.1 localhost\n", encoding="utf-8")
+    blocker = SiteBlocker(hosts_path=hosts_path)
+    for url in ("news.test", "video.test", "chat.test"):
+        blocker.add_site(db_session, url)
+    service = ProfileService(blocker)
+    service.add_profile(db_session, "alice")
+    service.block_site(db_session, "alice", "games.test")
+    service.allow_site(db_session, "alice", "chat.test")
+    return service
+
+
+def test_switch_profile_layers_overrides_and_applies_delta(
+    db_session, profiles
+) -> None:
+    hosts_path = profiles.site_blocker.hosts_path
+
+    # One addition and one exception: exactly two host changes either way.
+    assert profiles.switch_profile(db_session, "alice") == (1, 1)
+    assert _blocked_hosts(hosts_path) == {"news.test", "video.test", "games.test"}
+    assert profiles.switch_profile(db_session, "alice") == (0, 0)
+
+    assert profiles.switch_profile(db_session, None) == (1, 1)
+    assert _blocked_hosts(hosts_path) == {"news.test", "video.test", "chat.test"}
+
+
+def test_override_and_base_changes_follow_active_profile(db_session, profiles) -> None:
+    blocker = profiles.site_blocker
+    profiles.switch_profile(db_session, "alice")
+
+    blocker.add_site(db_session, "shop.test")
+    blocker.add_site(db_session, "chat.test")  # Still excepted for alice.
+    profiles.allow_site(db_session, "alice", "news.test")
+    assert set(blocker.snapshot) == {"video.test", "games.test", "shop.test"}
+
+    assert profiles.clear_override(db_session, "alice", "news.test") is True
+    assert "news.test" in blocker.snapshot
+
+    # The cached base-only set must reflect shop.test added while alice was active.
+    profiles.switch_profile(db_session, None)
+    assert _blocked_hosts(blocker.hosts_path) == {
+        "news.test",
+        "video.test",
+        "chat.test",
+        "shop.test",
+    }
+
+
+def test_load_current_restores_profile_on_startup(db_session, profiles) -> None:
+    profiles.switch_profile(db_session, "alice")
+
+    restarted = ProfileService(SiteBlocker(hosts_path=profiles.site_blocker.hosts_path))
+    assert restarted.load_current(db_session) == "alice"
+    restarted.site_blocker.apply_blocklist(db_session)
+    assert set(restarted.site_blocker.snapshot) == {
+        "news.test",
+        "video.test",
+        "games.test",
+    }
+
+    with pytest.raises(ValueError):
+        restarted.switch_profile(db_session, "nobody")
+
+
+class _FailingWriter:
+    def apply(self, entries):
+        raise SiteBlockerError("hosts helper went away")
+
+    add = apply
+    remove = apply
+
+
+def test_failed_hosts_write_keeps_previous_profile_state(db_session, profiles) -> None:
+    blocker = profiles.site_blocker
+    blocker.apply_blocklist(db_session)
+    blocker.hosts_writer = _FailingWriter()
+
+    with pytest.raises(SiteBlockerError):
+        profiles.switch_profile(db_session, "alice")
+    assert profiles.current_name is None
+    assert (blocker.profile_blocked, blocker.profile_allowed) == ({}, frozenset())
+
+    blocker.hosts_writer = None
+    profiles.switch_profile(db_session, "alice")
+    blocker.hosts_writer = _FailingWriter()
+    with pytest.raises(SiteBlockerError):
+        profiles.block_site(db_session, "alice", "rolled-back.test")
+    assert "rolled-back.test" not in blocker.profile_blocked
+    assert profiles.current_id not in profiles._overrides
+
+    blocker.hosts_writer = None
+    blocker.load_snapshot(db_session)
+    assert "games.test" in blocker.snapshot
+    assert "rolled-back.test" not in blocker.snapshot
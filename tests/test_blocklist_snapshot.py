@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from src.features.blocklist_snapshot import BlocklistSnapshot
+
+
+def test_load_orders_entries_and_bumps_version() -> None:
+    snapshot = BlocklistSnapshot()
+    assert not snapshot.loaded
+
+    snapshot.load([("zeta.test", "127.0.0.1"), ("alpha.test", "0.0.0.0")])
+
+    assert snapshot.loaded
+    assert snapshot.version == 1
+    assert list(snapshot.entries()) == [
+        ("alpha.test", "0.0.0.0"),
+        ("zeta.test", "127.0.0.1"),
+    ]
+
+
+def test_upsert_and_discard_only_bump_version_on_change() -> None:
+    snapshot = BlocklistSnapshot()
+    snapshot.load([])
+
+    assert snapshot.upsert("mid.test", "127.0.0.1") is True
+    assert snapshot.upsert("mid.test", "127.0.0.1") is False
+    assert snapshot.upsert("a.test", "127.0.0.1") is True
+    version = snapshot.version
+
+    assert snapshot.discard("missing.test") is False
+    assert snapshot.version == version
+    assert snapshot.discard("mid.test") is True
+    assert snapshot.version == version + 1
+    assert list(snapshot) == ["a.test"]
+    assert "mid.test" not in snapshot
+
+
+def test_apply_delta_rebuilds_index_once() -> None:
+    snapshot = BlocklistSnapshot()
+    snapshot.load(
+        [("b.test", "127.0.0.1"), ("d.test", "127.0.0.1"), ("f.test", "127.0.0.1")]
+    )
+    version = snapshot.version
+
+    changed, removed = snapshot.apply_delta(
+        [
+            ("a.test", "127.0.0.1"),
+            ("b.test", "127.0.0.1"),
+            ("d.test", "0.0.0.0"),
+            ("e.test", "127.0.0.1"),
+        ],
+        ["f.test", "missing.test", "e.test"],
+    )
+
+    assert changed == [
+        ("a.test", "127.0.0.1"),
+        ("d.test", "0.0.0.0"),
+        ("e.test", "127.0.0.1"),
+    ]
+    assert removed == ["f.test"]
+    assert snapshot.version == version + 1
+    assert list(snapshot.entries()) == [
+        ("a.test", "127.0.0.1"),
+        ("b.test", "127.0.0.1"),
+        ("d.test", "0.0.0.0"),
+        ("e.test", "127.0.0.1"),
+    ]
+    assert snapshot.apply_delta([("a.test", "127.0.0.1")], ["missing.test"]) == ([], [])
+    assert snapshot.version == version + 1
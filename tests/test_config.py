@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import os
 from pathlib import Path
 
 from src.config.config_loader import Config
@@ -25,3 +24,20 @@ def test_config_computes_database_url(tmp_path: Path, monkeypatch) -> None:
     cfg = Config(base_dir=base_dir)
 
     assert cfg.database_url.endswith("data/local.db")
+
+
+def test_config_resolves_archive_settings(config: Config) -> None:
+    assert config.archive_database_path == config.base_dir / "data" / "sbaas_archive.db"
+    assert config.focus_archive_horizon_days == 365
+
+
+def test_config_resolves_relative_subscriptions(tmp_path: Path) -> None:
+    (tmp_path / "settings.yaml").write_text(
+        "blocking:\n  subscriptions:\n    - lists/social.txt\n",
+        encoding="utf-8",
+    )
+
+    cfg = Config(base_dir=tmp_path)
+
+    assert cfg.blocklist_subscriptions == [tmp_path / "lists" / "social.txt"]
+    assert cfg.subscription_sync_minutes == 60
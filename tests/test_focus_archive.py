@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from src.config.db import Base
+from src.features.focus_archive import FocusArchiveService, FocusDailyRollup
+from src.features.focus_timer import FocusSession, FocusTimerService
+
+NOW = datetime(2026, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def hot_engine(tmp_path: Path):
+    engine = create_engine(f"sqlite:///{(tmp_path / 'hot.db').as_posix()}")
+    Base.metadata.create_all(engine)
+    service = FocusTimerService()
+    with Session(engine) as session:
+        for days_ago, seconds in ((400, 1500), (400, 600), (380, 900), (10, 1200)):
+            completed = NOW - timedelta(days=days_ago)
+            service.record_session(
+                session,
+                target_minutes=25,
+                actual_seconds=seconds,
+                started_at=completed - timedelta(seconds=seconds),
+                completed_at=completed,
+            )
+        session.commit()
+    yield engine
+    engine.dispose()
+
+
+def test_archive_moves_old_sessions_and_keeps_rollups(
+    hot_engine, tmp_path: Path
+) -> None:
+    service = FocusArchiveService(tmp_path / "archive.db", engine=hot_engine)
+
+    moved = service.archive_older_than(365, now=NOW)
+
+    assert moved == 3
+    with Session(hot_engine) as session:
+        assert session.scalar(select(func.count()).select_from(FocusSession)) == 1
+        rollups = session.scalars(
+            select(FocusDailyRollup).order_by(FocusDailyRollup.day)
+        ).all()
+    assert [(r.session_count, r.actual_seconds) for r in rollups] == [
+        (2, 2100),
+        (1, 900),
+    ]
+    assert service.archive_older_than(365, now=NOW) == 0
+
+
+def test_sessions_between_reads_archive_only_when_needed(
+    hot_engine, tmp_path: Path
+) -> None:
+    service = FocusArchiveService(tmp_path / "archive.db", engine=hot_engine)
+    service.archive_older_than(365, now=NOW)
+
+    recent = service.sessions_between(NOW - timedelta(days=30), NOW)
+    everything = service.sessions_between(NOW - timedelta(days=500), NOW)
+
+    assert [row.actual_seconds for row in recent] == [1200]
+    assert [row.actual_seconds for row in everything] == [1500, 600, 900, 1200]
+
+
+def test_archive_is_append_only(hot_engine, tmp_path: Path) -> None:
+    service = FocusArchiveService(tmp_path / "archive.db", engine=hot_engine)
+    service.archive_older_than(365, now=NOW)
+
+    with service._attached() as conn, pytest.raises(DBAPIError):
+        conn.exec_driver_sql("DELETE FROM archive.focus_sessions")
+
+
+def test_archiving_again_after_hot_table_emptied(hot_engine, tmp_path: Path) -> None:
+    service = FocusArchiveService(tmp_path / "archive.db", engine=hot_engine)
+    assert service.archive_older_than(1, now=NOW) == 4
+
+    with Session(hot_engine) as session:
+        FocusTimerService().record_session(
+            session,
+            target_minutes=25,
+            actual_seconds=300,
+            completed_at=NOW - timedelta(days=5),
+        )
+        session.commit()
+
+    assert service.archive_older_than(1, now=NOW) == 1
+    ids = [row.id for row in service.sessions_between(NOW - timedelta(days=500), NOW)]
+    assert len(ids) == len(set(ids)) == 5
+
+
+def test_archive_renumbers_ids_reused_by_legacy_tables(
+    hot_engine, tmp_path: Path
+) -> None:
+    service = FocusArchiveService(tmp_path / "archive.db", engine=hot_engine)
+    service.archive_older_than(365, now=NOW)
+
+    # Tables created without AUTOINCREMENT may hand an archived id out again.
+    with hot_engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO focus_sessions (id, target_minutes, actual_seconds, started_at, completed_at) "
+                "SELECT 1, 25, 60, started_at, started_at FROM focus_sessions LIMIT 1"
+            )
+        )
+
+    assert service.archive_older_than(1, now=NOW) == 2
+    ids = [row.id for row in service.sessions_between(NOW - timedelta(days=500), NOW)]
+    assert len(ids) == len(set(ids)) == 5
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import os
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.config.db import Base
+from src.features.focus_archive import FocusArchiveService
+from src.features.focus_history import FocusHistoryPage, FocusHistoryService
+from src.features.focus_timer import FocusTimerService
+from src.utils.helpers import downsample_lttb
+
+NOW = datetime(2026, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _seed(tmp_path: Path):
+    engine = create_engine(f"sqlite:///{(tmp_path / 'hot.db').as_posix()}")
+    Base.metadata.create_all(engine)
+    service = FocusTimerService()
+    with Session(engine) as session:
+        for days_ago in (500, 400, 20, 10, 10):
+            completed = NOW - timedelta(days=days_ago)
+            service.record_session(
+                session,
+                target_minutes=25,
+                actual_seconds=1500,
+                started_at=completed - timedelta(minutes=25),
+                completed_at=completed,
+            )
+        session.commit()
+    return engine
+
+
+def _collect(history: FocusHistoryService, engine, limit: int) -> list[list[int]]:
+    pages: list[list[int]] = []
+    cursor = None
+    with Session(engine) as session:
+        while True:
+            page = history.page(session, cursor, limit=limit)
+            pages.append([row[0] for row in page.rows])
+            if page.exhausted:
+                return pages
+            cursor = page.cursor
+
+
+def test_keyset_pages_are_newest_first_and_complete(tmp_path: Path) -> None:
+    engine = _seed(tmp_path)
+
+    pages = _collect(FocusHistoryService(), engine, limit=2)
+
+    assert pages == [[5, 4], [3, 2], [1]]
+
+
+def test_pages_continue_into_archive(tmp_path: Path) -> None:
+    engine = _seed(tmp_path)
+    archive = FocusArchiveService(tmp_path / "archive.db", engine=engine)
+    archive.archive_older_than(365, now=NOW)
+
+    pages = _collect(FocusHistoryService(archive), engine, limit=2)
+
+    assert [session_id for page in pages for session_id in page] == [5, 4, 3, 2, 1]
+
+
+def test_daily_seconds_merges_rollups_and_hot_rows(tmp_path: Path) -> None:
+    engine = _seed(tmp_path)
+    FocusArchiveService(tmp_path / "archive.db", engine=engine).archive_older_than(
+        365, now=NOW
+    )
+
+    with Session(engine) as session:
+        series = FocusHistoryService().daily_seconds(session)
+        recent = FocusHistoryService().daily_seconds(session, start=date(2026, 5, 1))
+
+    assert [seconds for _day, seconds in series] == [1500, 1500, 1500, 3000]
+    assert recent == [(date(2026, 5, 12), 1500), (date(2026, 5, 22), 3000)]
+
+
+def test_downsample_lttb_keeps_endpoints_and_peaks() -> None:
+    points = [(float(x), 0.0) for x in range(1000)]
+    points[500] = (500.0, 100.0)
+
+    sampled = downsample_lttb(points, 50)
+
+    assert len(sampled) == 50
+    assert sampled[0] == points[0]
+    assert sampled[-1] == points[-1]
+    assert (500.0, 100.0) in sampled
+    assert downsample_lttb(points[:10], 50) == points[:10]
+
+
+class _ListHistory(FocusHistoryService):
+    """In-memory stand-in that serves keyset pages from a list and counts reads."""
+
+    def __init__(self, total: int) -> None:
+        super().__init__()
+        self.rows = [
+            (row_id, 25, 60 * row_id, NOW, NOW - timedelta(minutes=row_id))
+            for row_id in range(1, total + 1)
+        ]
+        self.reads = 0
+
+    def page(self, session, cursor=None, limit=200) -> FocusHistoryPage:
+        self.reads += 1
+        start = 0 if cursor is None else cursor[1]
+        rows = self.rows[start : start + limit]
+        next_cursor = (rows[-1][4], rows[-1][0]) if len(rows) == limit else None
+        return FocusHistoryPage(rows=rows, cursor=next_cursor)
+
+
+def test_history_model_keeps_a_bounded_window_of_pages() -> None:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtCore import QCoreApplication, QModelIndex
+
+    from src.ui.focus_history_view import FocusHistoryModel
+
+    QCoreApplication.instance() or QCoreApplication([])
+    history = _ListHistory(total=95)
+    model = FocusHistoryModel(history, page_size=10, max_pages=3)
+    model.reload()
+    while model.canFetchMore(QModelIndex()):
+        model.fetchMore(QModelIndex())
+
+    assert model.rowCount() == 95
+    assert len(model._pages) == 3
+    assert history.reads == 10
+
+    # Scrolling back re-reads the evicted page from its remembered cursor.
+    assert model.data(model.index(0, 2)) == "1.0"
+    assert model.data(model.index(5, 2)) == "6.0"
+    assert history.reads == 11
+    assert sorted(model._pages) == [0, 7, 8]
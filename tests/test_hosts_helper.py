@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+
+import pytest
+
+from src.features.hosts_helper import HostsWriterClient, HostsWriterHelper
+from src.features.site_blocker import (
+    HostEntry,
+    SiteBlocker,
+    SiteBlockerError,
+    hosts_fingerprint,
+    parse_managed_entries,
+)
+
+
+def _prepare_hosts(tmp_path: Path) -> Path:
+    hosts_path = tmp_path / "hosts"
+    hosts_path.write_text(
+        "127.0.0.1 localhost\n127.0.0.1\tstale.test\t# SBAAS_BLOCK\n",
+        encoding="utf-8",
+    )
+    return hosts_path
+
+
+def test_process_batch_folds_commands_into_one_write(tmp_path) -> None:
+    hosts_path = _prepare_hosts(tmp_path)
+    helper = HostsWriterHelper(hosts_path)
+    assert helper.state == {"stale.test": "127.0.0.1"}
+
+    fingerprint = helper.process_batch(
+        [
+            {"op": "add", "entries": [("a.test", "127.0.0.1"), ("b.test", "0.0.0.0")]},
+            {"op": "remove", "hostnames": ["stale.test", "a.test"]},
+        ]
+    )
+
+    assert helper.writes == 1
+    lines = hosts_path.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == "127.0.0.1 localhost"
+    assert parse_managed_entries(lines) == [HostEntry("b.test", "0.0.0.0")]
+    assert fingerprint == hosts_fingerprint([HostEntry("b.test", "0.0.0.0")])
+
+
+def test_site_blocker_delegates_to_helper(db_session, tmp_path) -> None:
+    hosts_path = _prepare_hosts(tmp_path)
+    helper = HostsWriterHelper(hosts_path, debounce=0.2)
+    listener = Listener(("127.0.0.1", 0), authkey=b"test-key")
+    stop = threading.Event()
+    server = threading.Thread(target=helper.serve, args=(listener, stop), daemon=True)
+    server.start()
+
+    client = HostsWriterClient.connect(listener.address, b"test-key")
+    try:
+        blocker = SiteBlocker(hosts_path=tmp_path / "unused-hosts", hosts_writer=client)
+        blocker.apply_blocklist(db_session)
+        for index in range(5):
+            blocker.add_site(db_session, f"burst-{index}.test")
+        blocker.remove_site(db_session, "burst-0.test")
+        ack = client.wait()
+    finally:
+        client.close()
+        stop.set()
+        listener.close()
+
+    assert helper.writes < 7
+    hosts_text = hosts_path.read_text(encoding="utf-8")
+    assert "burst-4.test" in hosts_text
+    assert "burst-0.test" not in hosts_text
+    assert "stale.test" not in hosts_text
+    expected = [HostEntry(hostname, ip) for hostname, ip in blocker.snapshot.entries()]
+    assert ack.fingerprint == hosts_fingerprint(expected)
+    assert not (tmp_path / "unused-hosts").exists()
+
+
+class _TouchOnUnpickle:
+    def __init__(self, marker: Path) -> None:
+        self.marker = marker
+
+    def __reduce__(self):
+        return (Path.touch, (self.marker,))
+
+
+def test_helper_never_unpickles_messages(tmp_path) -> None:
+    helper = HostsWriterHelper(_prepare_hosts(tmp_path), debounce=0.05)
+    listener = Listener(("127.0.0.1", 0), authkey=b"test-key")
+    stop = threading.Event()
+    threading.Thread(target=helper.serve, args=(listener, stop), daemon=True).start()
+
+    marker = tmp_path / "pwned"
+    try:
+        with Client(listener.address, authkey=b"test-key") as raw:
+            raw.send(_TouchOnUnpickle(marker))
+            time.sleep(0.3)
+    finally:
+        stop.set()
+        listener.close()
+
+    assert not marker.exists()
+    assert helper.writes == 0
+
+
+@pytest.mark.parametrize(
+    "entry",
+    [
+        ["x.test\n6.6.6.6 bank.example", "127.0.0.1"],
+        ["x.test # note", "127.0.0.1"],
+        ["x.test", "not-an-ip"],
+        ["x.test", "127.0.0.1\nbank.example"],
+    ],
+)
+def test_helper_rejects_entries_that_could_inject_lines(tmp_path, entry) -> None:
+    hosts_path = _prepare_hosts(tmp_path)
+    before = hosts_path.read_text(encoding="utf-8")
+    helper = HostsWriterHelper(hosts_path)
+
+    with pytest.raises(SiteBlockerError):
+        helper.process_batch(
+            [{"op": "add", "entries": [["ok.test", "127.0.0.1"], entry]}]
+        )
+
+    assert helper.writes == 0
+    assert hosts_path.read_text(encoding="utf-8") == before
+    assert helper.state == {"stale.test": "127.0.0.1"}
+
+
+def test_client_gets_error_ack_for_invalid_entry(tmp_path) -> None:
+    hosts_path = _prepare_hosts(tmp_path)
+    helper = HostsWriterHelper(hosts_path, debounce=0.05)
+    listener = Listener(("127.0.0.1", 0), authkey=b"test-key")
+    stop = threading.Event()
+    threading.Thread(target=helper.serve, args=(listener, stop), daemon=True).start()
+
+    client = HostsWriterClient.connect(listener.address, b"test-key")
+    try:
+        bad = client.add([HostEntry("x.test\n6.6.6.6 bank.example", "127.0.0.1")])
+        with pytest.raises(SiteBlockerError, match="Invalid hostname"):
+            client.wait(bad)
+        client.add([HostEntry("good.test", "127.0.0.1")])
+        client.wait()
+    finally:
+        client.close()
+        stop.set()
+        listener.close()
+
+    hosts_text = hosts_path.read_text(encoding="utf-8")
+    assert "bank.example" not in hosts_text
+    assert "good.test" in hosts_text
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from src.utils.sampling_profiler import (
+    SamplingProfiler,
+    collapse_stack,
+    write_collapsed,
+)
+
+
+def _busy_worker(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_collapse_stack_is_root_first() -> None:
+    def inner() -> str:
+        return collapse_stack(sys._getframe(), prefix="MainThread")
+
+    stack = inner()
+
+    assert stack.startswith("MainThread;")
+    assert stack.endswith("test_sampling_profiler.py:inner")
+
+
+def test_profiler_samples_other_threads_for_duration(tmp_path: Path) -> None:
+    stop = threading.Event()
+    worker = threading.Thread(
+        target=_busy_worker, args=(stop,), name="busy", daemon=True
+    )
+    worker.start()
+    finished: list[Counter[str]] = []
+    profiler = SamplingProfiler(interval=0.001)
+    try:
+        profiler.start(duration=0.1, on_finish=finished.append)
+        deadline = time.monotonic() + 2
+        while not finished and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        stop.set()
+
+    [samples] = finished
+    assert any(key.startswith("busy;") and "_busy_worker" in key for key in samples)
+    assert not any("sampling-profiler" in key for key in samples)
+
+    output = write_collapsed(samples, tmp_path / "profiles" / "run.collapsed")
+    first_line = output.read_text(encoding="utf-8").splitlines()[0]
+    stack, count = first_line.rsplit(" ", 1)
+    assert stack and int(count) > 0
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import os
+import uuid
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication
+
+from src.ui.single_instance import (
+    LaunchRequest,
+    SingleInstanceGuard,
+    decode_launch_request,
+    encode_launch_request,
+    instance_key,
+)
+
+
+def test_launch_request_round_trip() -> None:
+    request = LaunchRequest(
+        block_domains=("example.com", "news.test"), focus_minutes=25
+    )
+
+    encoded = encode_launch_request(request)
+
+    assert encoded.endswith(b"\n")
+    assert decode_launch_request(encoded) == request
+
+
+def test_decode_ignores_malformed_payloads() -> None:
+    assert decode_launch_request(b"not json").is_empty
+    assert decode_launch_request(b'{"block": [1, ""], "focus": -5}').is_empty
+
+
+def test_instance_key_is_socket_safe() -> None:
+    key = instance_key("SBAAS Productivity")
+    assert " " not in key
+    assert key.startswith("sbaas-productivity-")
+
+
+def test_second_guard_cannot_take_over_a_live_server() -> None:
+    app = QCoreApplication.instance() or QCoreApplication([])
+    key = f"sbaas-test-{uuid.uuid4().hex[:12]}"
+    first = SingleInstanceGuard(key)
+    second = SingleInstanceGuard(key)
+    received: list[LaunchRequest] = []
+    first.request_received.connect(received.append)
+
+    assert first.listen() is True
+    try:
+        assert second.listen() is False
+        assert second.forward(LaunchRequest(block_domains=("late.test",)))
+        for _ in range(50):
+            app.processEvents()
+            if received:
+                break
+    finally:
+        first.close()
+
+    assert received == [LaunchRequest(block_domains=("late.test",))]
@@ -2,9 +2,24 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from sqlalchemy import select
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import Session
 
-from src.features.site_blocker import BlockedSite, HOSTS_MARKER, SiteBlocker
+from src.config.db import init_db
+
+from src.features.site_blocker import (
+    HOSTS_LAYOUT_PACKED,
+    HOSTS_MARKER,
+    BlockedSite,
+    HostEntry,
+    SiteBlocker,
+    SiteBlockerError,
+    is_managed_line,
+    parse_managed_entries,
+    render_hosts_lines,
+)
+from src.utils.file_lock import FileLock
 
 
 def _prepare_hosts(tmp_path: Path) -> Path:
@@ -41,3 +56,207 @@ def test_remove_site_cleans_hosts_entry(db_session, tmp_path) -> None:
     assert "blocked.test" not in hosts_text
     # Non-managed lines remain untouched.
     assert "localhost" in hosts_text
+
+
+def test_mutations_patch_shared_snapshot(db_session, tmp_path) -> None:
+    hosts_path = _prepare_hosts(tmp_path)
+    blocker = SiteBlocker(hosts_path=hosts_path)
+    blocker.apply_blocklist(db_session)
+    version = blocker.snapshot.version
+
+    blocker.add_site(db_session, "snapshot.test", redirect_ip="0.0.0.0")
+    assert blocker.snapshot.redirect_ip("snapshot.test") == "0.0.0.0"
+    assert blocker.snapshot.version > version
+
+    blocker.remove_site(db_session, "snapshot.test")
+    assert "snapshot.test" not in blocker.snapshot
+    assert "snapshot.test" not in hosts_path.read_text(encoding="utf-8")
+
+
+def test_rewrite_fails_while_another_process_holds_hosts_lock(
+    db_session, tmp_path
+) -> None:
+    hosts_path = _prepare_hosts(tmp_path)
+    blocker = SiteBlocker(hosts_path=hosts_path, lock_timeout=0.1)
+    other = FileLock(blocker.hosts_lock.path)
+
+    with other, pytest.raises(SiteBlockerError):
+        blocker.add_site(db_session, "locked.test")
+
+    assert "locked.test" not in hosts_path.read_text(encoding="utf-8")
+
+
+def test_sync_sources_applies_only_the_delta(db_session, tmp_path) -> None:
+    hosts_path = _prepare_hosts(tmp_path)
+    source_path = tmp_path / "social.txt"
+    source_path.write_text(
+        "# curated\nsub-a.test\n0.0.0.0 sub-b.test sub-c.test\n", encoding="utf-8"
+    )
+    blocker = SiteBlocker(hosts_path=hosts_path)
+    blocker.add_source(db_session, source_path)
+
+    [first] = blocker.sync_sources(db_session)
+    assert (first.added, first.removed, first.skipped) == (3, 0, False)
+
+    [unchanged] = blocker.sync_sources(db_session)
+    assert unchanged.skipped is True
+
+    source_path.write_text("sub-a.test\nsub-d.test\n", encoding="utf-8")
+    [delta] = blocker.sync_sources(db_session)
+    assert (delta.added, delta.removed) == (1, 2)
+
+    assert {"sub-a.test", "sub-d.test"} <= set(blocker.snapshot)
+    assert "sub-b.test" not in blocker.snapshot
+    hosts_text = hosts_path.read_text(encoding="utf-8")
+    assert "sub-d.test" in hosts_text
+    assert "sub-c.test" not in hosts_text
+
+
+def test_sync_sources_respects_manual_blocks_and_removals(db_session, tmp_path) -> None:
+    source_path = tmp_path / "list.txt"
+    source_path.write_text("manual.test\nremoved.test\n", encoding="utf-8")
+    blocker = SiteBlocker(hosts_path=_prepare_hosts(tmp_path))
+    blocker.add_site(db_session, "manual.test")
+    blocker.add_site(db_session, "removed.test")
+    blocker.remove_site(db_session, "removed.test")
+
+    blocker.add_source(db_session, source_path)
+    blocker.sync_sources(db_session)
+    assert "removed.test" not in blocker.snapshot
+
+    source_path.write_text("other.test\n", encoding="utf-8")
+    blocker.sync_sources(db_session)
+    assert {"manual.test", "other.test"} <= set(blocker.snapshot)
+
+
+def test_reconcile_sources_drops_unconfigured_and_tolerates_missing_files(
+    db_session, tmp_path
+) -> None:
+    kept_path = tmp_path / "kept.txt"
+    kept_path.write_text("kept.test\n", encoding="utf-8")
+    gone_path = tmp_path / "gone.txt"
+    gone_path.write_text("gone.test\nkept.test\n", encoding="utf-8")
+    blocker = SiteBlocker(hosts_path=_prepare_hosts(tmp_path))
+    blocker.reconcile_sources(db_session, [kept_path, gone_path])
+    blocker.sync_sources(db_session)
+
+    gone_path.unlink()
+    missing = blocker.sync_sources(db_session)
+    assert {Path(result.location).name for result in missing if result.error} == {
+        "gone.txt"
+    }
+
+    assert blocker.reconcile_sources(db_session, [kept_path]) == [
+        str(gone_path.resolve())
+    ]
+    assert "gone.test" not in blocker.snapshot
+    assert "kept.test" in blocker.snapshot
+    assert [result.error for result in blocker.sync_sources(db_session)] == [None]
+
+
+def test_upgraded_database_keeps_manual_blocks_and_removals(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{(tmp_path / 'legacy.db').as_posix()}")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE blocked_sites (id INTEGER PRIMARY KEY, url VARCHAR(255) NOT NULL UNIQUE, "
+                "redirect_ip VARCHAR(45) NOT NULL, is_active BOOLEAN NOT NULL, created_at DATETIME NOT NULL)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO blocked_sites (url, redirect_ip, is_active, created_at) VALUES "
+                "('manual.test', '127.0.0.1', 1, '2025-01-01'), ('removed.test', '127.0.0.1', 0, '2025-01-01')"
+            )
+        )
+    init_db(engine)
+
+    source_path = tmp_path / "list.txt"
+    source_path.write_text("manual.test\nremoved.test\n", encoding="utf-8")
+    blocker = SiteBlocker(hosts_path=_prepare_hosts(tmp_path))
+    with Session(engine) as session:
+        blocker.reconcile_sources(session, [source_path])
+        blocker.sync_sources(session)
+        assert "removed.test" not in blocker.snapshot
+
+        source_path.write_text("other.test\n", encoding="utf-8")
+        blocker.sync_sources(session)
+        assert {"manual.test", "other.test"} <= set(blocker.snapshot)
+        assert "removed.test" not in blocker.snapshot
+    engine.dispose()
+
+
+def test_category_toggle_updates_effective_set(db_session, tmp_path) -> None:
+    hosts_path = _prepare_hosts(tmp_path)
+    blocker = SiteBlocker(hosts_path=hosts_path)
+    blocker.add_site(db_session, "uncategorized.test")
+
+    assert (
+        blocker.assign_category(
+            db_session, "Social", ["cat-a.test", "https://cat-b.test/feed"]
+        )
+        == 2
+    )
+    assert {"cat-a.test", "cat-b.test"} <= set(blocker.snapshot)
+
+    assert blocker.set_category_active(db_session, "social", False) is True
+    assert "cat-a.test" not in blocker.snapshot
+    assert "uncategorized.test" in blocker.snapshot
+    hosts_text = hosts_path.read_text(encoding="utf-8")
+    assert "cat-b.test" not in hosts_text
+    assert "uncategorized.test" in hosts_text
+
+    blocker.set_category_active(db_session, "social", True)
+    assert "cat-b.test" in hosts_path.read_text(encoding="utf-8")
+    [summary] = [c for c in blocker.list_categories(db_session) if c.name == "social"]
+    assert (summary.is_active, summary.site_count) == (True, 2)
+    assert blocker.set_category_active(db_session, "missing", False) is False
+
+
+def test_packed_layout_groups_by_redirect_ip() -> None:
+    entries = [HostEntry(f"p{index}.test", "127.0.0.1") for index in range(5)]
+    entries.append(HostEntry("zero.test", "0.0.0.0"))
+
+    lines = render_hosts_lines(entries, HOSTS_LAYOUT_PACKED, hostnames_per_line=2)
+
+    assert lines == [
+        f"127.0.0.1\tp0.test p1.test\t{HOSTS_MARKER}",
+        f"127.0.0.1\tp2.test p3.test\t{HOSTS_MARKER}",
+        f"127.0.0.1\tp4.test\t{HOSTS_MARKER}",
+        f"0.0.0.0\tzero.test\t{HOSTS_MARKER}",
+    ]
+    assert sorted(parse_managed_entries(lines), key=lambda e: e.hostname) == sorted(
+        entries, key=lambda e: e.hostname
+    )
+
+
+def test_switching_layouts_round_trips_managed_section(db_session, tmp_path) -> None:
+    hosts_path = tmp_path / "hosts"
+    hosts_path.write_text(
+        "127.0.0.1 localhost\n# note about # SBAAS_BLOCK markers\n", encoding="utf-8"
+    )
+    line_blocker = SiteBlocker(hosts_path=hosts_path)
+    for index in range(4):
+        line_blocker.add_site(db_session, f"layout-{index}.test")
+    line_entries = parse_managed_entries(
+        hosts_path.read_text(encoding="utf-8").splitlines()
+    )
+
+    packed_blocker = SiteBlocker(
+        hosts_path=hosts_path, hosts_layout=HOSTS_LAYOUT_PACKED, hostnames_per_line=3
+    )
+    packed_blocker.apply_blocklist(db_session)
+    lines = hosts_path.read_text(encoding="utf-8").splitlines()
+
+    assert lines[:2] == ["127.0.0.1 localhost", "# note about # SBAAS_BLOCK markers"]
+    assert parse_managed_entries(lines) == line_entries
+    assert len([line for line in lines if is_managed_line(line)]) < len(line_entries)
+
+
+def test_add_site_rejects_hostnames_unsafe_for_hosts(db_session, tmp_path) -> None:
+    blocker = SiteBlocker(hosts_path=_prepare_hosts(tmp_path))
+
+    for raw in ("a..test", "-lead.test", "a_b c.test", "user@evil.test"):
+        with pytest.raises(SiteBlockerError):
+            blocker.add_site(db_session, raw)
+    assert blocker.add_site(db_session, "Bücher.test").url == "xn--bcher-kva.test"
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from src.ui.stall_watchdog import EventLoopWatchdog
+
+
+def _block_gui_thread() -> None:
+    time.sleep(0.4)
+
+
+def test_watchdog_reports_one_stall_with_blocking_stack(caplog) -> None:
+    QCoreApplication.instance() or QCoreApplication([])
+    watchdog = EventLoopWatchdog(threshold_ms=150, heartbeat_ms=20)
+    loop = QEventLoop()
+    QTimer.singleShot(100, _block_gui_thread)
+    QTimer.singleShot(800, loop.quit)
+
+    with caplog.at_level(logging.WARNING, logger="src.ui.stall_watchdog"):
+        watchdog.start()
+        try:
+            loop.exec()
+        finally:
+            watchdog.stop()
+
+    assert watchdog.stalls == 1
+    assert watchdog.max_latency >= 0.15
+    [record] = [record for record in caplog.records if "stalled" in record.getMessage()]
+    assert "_block_gui_thread" in record.getMessage()